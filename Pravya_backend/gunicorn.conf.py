@@ -0,0 +1,16 @@
+# Gunicorn settings for the backend container.
+# Each worker is a separate process with its own event loop and GIL, so
+# CPU-side work (Pydantic, JSON, regex) on one request doesn't stall the rest.
+# Consecutive requests from one player can land on different workers, so
+# in-process state may only be a cache that is safe to miss (question rows).
+# Anything a later request must agree with, like the team hints a trust
+# decision is judged against, travels through the client instead.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 30
+# Gemini calls can take several seconds; leave headroom before a worker is recycled
+timeout = 60
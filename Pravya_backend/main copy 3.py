@@ -1,14 +1,21 @@
 # --- START OF FILE main.py ---
 
 import os
+import asyncio
+import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import create_client, Client
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from story_generator import (
     generate_story_for_question,
+    stream_story_for_question,
     generate_imposter_challenge,
     generate_boss_battle_turn
 )
@@ -17,10 +24,35 @@ from story_generator import (
 load_dotenv()
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
-supabase: Client = create_client(url, key)
-app = FastAPI()
+supabase: AsyncClient | None = None  # created on startup, the async client needs a running loop
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# One pooled HTTP/2 connection set shared by every Supabase call, so requests
+# reuse warm TCP/TLS connections instead of handshaking per burst
+http_client: httpx.AsyncClient | None = None
+
+@app.on_event("startup")
+async def init_supabase():
+    global supabase, http_client
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30),
+    )
+    supabase = await acreate_client(url, key, options=AsyncClientOptions(httpx_client=http_client))
+    # Pre-warm the connection so the first player doesn't pay the TLS handshake
+    try:
+        await supabase.table('questions').select('id').limit(1).execute()
+    except Exception as e:
+        print(f"!!! Supabase warm-up query failed: {e} !!!")
+
+@app.on_event("shutdown")
+async def close_supabase():
+    if http_client is not None:
+        await http_client.aclose()
 
 # --- MIDDLEWARE ---
+# Story payloads are several KB of JSON prose; compress anything over 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,6 +63,9 @@ app.add_middleware(
 
 # --- DATA MODELS ---
 class TestState(BaseModel):
+    # Reject unknown keys outright instead of carrying them through validation
+    model_config = ConfigDict(extra='forbid', str_strip_whitespace=True)
+
     mastery: str
     game_mode: str = "story" # 'story', 'imposter', or 'boss_battle'
     current_question_index: int = 0
@@ -47,72 +82,194 @@ def check_for_achievements(state: TestState) -> str | None:
         return "Ritualistic Precision"
     return None
 
+def apply_answer_result(state: TestState, was_correct: bool) -> None:
+    if was_correct:
+        state.agent_sanity = min(100, state.agent_sanity + 5)
+        state.correct_streak += 1
+    else:
+        state.agent_sanity = max(0, state.agent_sanity - 20)
+        state.correct_streak = 0
+
+QUESTION_ORDER_TTL = 300  # seconds
+# Bounded because mastery comes from the client; unknown masteries still get
+# (empty) entries, but they expire and cannot grow the worker without limit
+question_order_cache: TTLCache = TTLCache(maxsize=256, ttl=QUESTION_ORDER_TTL)
+
+async def get_question_order(mastery: str) -> tuple[list[dict], list[dict]]:
+    """Ordered (id, expected_outcome) rows for a mastery, cached briefly.
+
+    Returns the rows used to grade previous answers (rating >= 8) and the
+    playable subset served as new questions (rating >= 60), both ordered by
+    difficulty_rating then id so current_question_index indexes straight in.
+    """
+    cached = question_order_cache.get(mastery)
+    if cached is not None:
+        return cached
+    response = await supabase.table('questions').select('id, expected_outcome, difficulty_rating').eq('mastery', mastery).gte('difficulty_rating', 8).order('difficulty_rating').order('id').execute()
+    graded = response.data
+    playable = [row for row in graded if row['difficulty_rating'] >= 60]
+    question_order_cache[mastery] = (graded, playable)
+    return graded, playable
+
 # --- API ENDPOINTS ---
 @app.get("/masteries")
-def get_masteries():
+async def get_masteries():
     try:
-        response = supabase.table('questions').select('mastery', count='exact').execute()
+        response = await supabase.table('questions').select('mastery', count='exact').execute()
         masteries = list(set(item['mastery'] for item in response.data))
         return {"masteries": masteries}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def advance_turn(state: TestState) -> tuple[dict | None, bool | None, str | None]:
+    """Grade the previous answer into state and load the next question.
+
+    Returns (question_data, was_previous_answer_correct, earned_artifact);
+    question_data is None when the run is over.
+    """
+    was_previous_answer_correct = None
+
+    # Resolve both questions from the cached ordering, then fetch only the
+    # new question's row by primary key.
+    graded, playable = await get_question_order(state.mastery)
+    idx = state.current_question_index
+    prev_expected_outcome = graded[idx - 1]['expected_outcome'] if 0 < idx <= len(graded) else None
+    question_data = None
+    if idx < len(playable):
+        question_res = await supabase.table('questions').select('*').eq('id', playable[idx]['id']).execute()
+        question_data = question_res.data[0] if question_res.data else None
+
+    # --- 1. CHECK PREVIOUS ANSWER & UPDATE SANITY (shared logic) ---
+    if state.current_question_index > 0 and state.user_answer is not None and prev_expected_outcome is not None:
+        was_previous_answer_correct = prev_expected_outcome.lower().strip() in state.user_answer.lower().strip()
+        apply_answer_result(state, was_previous_answer_correct)
+    
+    earned_artifact = check_for_achievements(state)
+    if earned_artifact and earned_artifact not in state.artifacts:
+        state.artifacts.append(earned_artifact)
+
+    if state.agent_sanity <= 0:
+        question_data = None
+    return question_data, was_previous_answer_correct, earned_artifact
+
+# Background prefetch of the next turn's story. The next question is fixed by
+# the cached ordering and the only unknown is whether the current answer will
+# be right, so both outcomes are generated into story_cache while the player
+# reads. A player who answers before it finishes joins the in-flight call on
+# either endpoint, streaming or not.
+prefetch_tasks: set[asyncio.Task] = set()
+
+async def prefetch_next_story(state: TestState):
+    try:
+        _, playable = await get_question_order(state.mastery)
+        idx = state.current_question_index + 1
+        if idx >= len(playable):
+            return
+        question_res = await supabase.table('questions').select('*').eq('id', playable[idx]['id']).execute()
+        if not question_res.data:
+            return
+        for was_correct in (True, False):
+            next_state = state.model_copy(deep=True)
+            apply_answer_result(next_state, was_correct)
+            if next_state.agent_sanity <= 0:
+                continue
+            await asyncio.to_thread(
+                generate_story_for_question,
+                question=question_res.data[0],
+                mastery=next_state.mastery,
+                agent_sanity=next_state.agent_sanity,
+                was_correct=was_correct,
+                earned_artifact=check_for_achievements(next_state)
+            )
+    except Exception as e:
+        print(f"!!! Story prefetch failed: {e} !!!")
+
+def schedule_prefetch(state: TestState):
+    if state.game_mode != 'story':
+        return
+    task = asyncio.create_task(prefetch_next_story(state.model_copy(deep=True)))
+    prefetch_tasks.add(task)
+    task.add_done_callback(prefetch_tasks.discard)
+
 @app.post("/get-next-question")
-def get_next_question(state: TestState):
+async def get_next_question(state: TestState):
     try:
-        was_previous_answer_correct = None
-        
-        # --- 1. CHECK PREVIOUS ANSWER & UPDATE SANITY (shared logic) ---
-        if state.current_question_index > 0 and state.user_answer is not None:
-            previous_question_index = state.current_question_index - 1
-            prev_q_res = supabase.table('questions').select('expected_outcome').eq('mastery', state.mastery).gte('difficulty_rating', 8).order('difficulty_rating').order('id').limit(1).offset(previous_question_index).execute()
-            
-            if prev_q_res.data:
-                expected_outcome = prev_q_res.data[0]['expected_outcome']
-                if expected_outcome.lower().strip() in state.user_answer.lower().strip():
-                    was_previous_answer_correct = True
-                    state.agent_sanity = min(100, state.agent_sanity + 5)
-                    state.correct_streak += 1
-                else:
-                    was_previous_answer_correct = False
-                    state.agent_sanity = max(0, state.agent_sanity - 20)
-                    state.correct_streak = 0
-        
-        earned_artifact = check_for_achievements(state)
-        if earned_artifact and earned_artifact not in state.artifacts:
-            state.artifacts.append(earned_artifact)
+        question_data, was_previous_answer_correct, earned_artifact = await advance_turn(state)
 
-        # --- 2. FETCH NEW QUESTION (shared logic) ---
-        question_res = supabase.table('questions').select('*').eq('mastery', state.mastery).gte('difficulty_rating', 60).order('difficulty_rating').order('id').limit(1).offset(state.current_question_index).execute()
-        
-        if not question_res.data or state.agent_sanity <= 0:
+        # --- 2. NEW QUESTION (shared logic) ---
+        if not question_data:
             status = "completed" # Can mean success or failure (madness)
             # Add final achievement based on outcome
-            return {"status": status, "updated_state": state.dict()}
-
-        question_data = question_res.data[0]
+            return {"status": status, "updated_state": state.model_dump()}
         
         # --- 3. GAME MODE ROUTER ---
         # Call the appropriate generator based on the selected game mode.
+        # The Gemini SDK call is blocking, so it runs on a worker thread.
         if state.game_mode == 'imposter':
-            story_payload = generate_imposter_challenge(question_data, state)
+            story_payload = await asyncio.to_thread(generate_imposter_challenge, question_data, state)
         elif state.game_mode == 'boss_battle':
-            story_payload = generate_boss_battle_turn(question_data, state)
+            story_payload = await asyncio.to_thread(generate_boss_battle_turn, question_data, state)
         else: # Default to 'story' mode
-            story_payload = generate_story_for_question(
+            story_payload = await asyncio.to_thread(
+                generate_story_for_question,
                 question=question_data,
                 mastery=state.mastery,
                 agent_sanity=state.agent_sanity,
                 was_correct=was_previous_answer_correct,
                 earned_artifact=earned_artifact
             )
+        schedule_prefetch(state)
         
         return {
             "status": "in_progress",
             "story_payload": story_payload,
-            "updated_state": state.dict()
+            "updated_state": state.model_dump()
         }
     except Exception as e:
         print(f"!!! MASTER ERROR in /get-next-question: {e} !!!")
         raise HTTPException(status_code=500, detail="An unexpected error occurred on the backend.")
+
+@app.post("/get-next-question/stream")
+async def stream_next_question(state: TestState):
+    """NDJSON variant of /get-next-question for clients that render as text arrives.
+
+    Lines, in order: {"status", "updated_state"}; in story mode zero or more
+    {"narrative": prose delta} as the chapter is generated, plus a
+    {"reset": true} if generation failed after prose was sent and the partial
+    text must be discarded; then {"story_payload"}. A completed run sends only
+    the first line.
+    """
+    try:
+        question_data, was_previous_answer_correct, earned_artifact = await advance_turn(state)
+    except Exception as e:
+        print(f"!!! MASTER ERROR in /get-next-question/stream: {e} !!!")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred on the backend.")
+
+    status = "in_progress" if question_data else "completed"
+    head = {"status": status, "updated_state": state.model_dump()}
+    if question_data:
+        schedule_prefetch(state)
+
+    # Sync generator: Starlette iterates it in its threadpool, so the blocking
+    # Gemini stream never runs on the event loop.
+    def lines():
+        yield orjson.dumps(head) + b"\n"
+        if not question_data:
+            return
+        if state.game_mode == 'imposter':
+            events = [{"story_payload": generate_imposter_challenge(question_data, state)}]
+        elif state.game_mode == 'boss_battle':
+            events = [{"story_payload": generate_boss_battle_turn(question_data, state)}]
+        else:
+            events = stream_story_for_question(
+                question=question_data,
+                mastery=state.mastery,
+                agent_sanity=state.agent_sanity,
+                was_correct=was_previous_answer_correct,
+                earned_artifact=earned_artifact
+            )
+        for event in events:
+            yield orjson.dumps(event) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 # --- END OF FILE main.py ---
\ No newline at end of file
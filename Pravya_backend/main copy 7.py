@@ -891,11 +891,13 @@ def generate_fallback_hints(question_data: Dict[str, Any], wrong_advisor: str) -
     ]
     
     # Make sure the wrong advisor gives the wrong hint
+    wrong_character = {
+        "senior_dev": "alex_chen",
+        "security_lead": "maya_rodriguez",
+        "junior_dev": "jordan_kim"
+    }.get(wrong_advisor, "alex_chen")
     for hint in hints:
-        if hint["character"] == wrong_advisor.replace("_", "_"):
-            hint["is_correct"] = False
-        elif hint["is_correct"] == False and hint["character"] != wrong_advisor.replace("_", "_"):
-            hint["is_correct"] = True
+        hint["is_correct"] = hint["character"] != wrong_character
     
     return hints
 
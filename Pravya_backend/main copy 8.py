@@ -771,7 +771,7 @@ async def submit_answer(submission: AnswerSubmission):
     try:
         question = None
         # Check if the question is a boss battle question
-        if "boss" in submission.question_id:
+        if submission.question_id.startswith("boss-"):
             # If so, generate the question data locally instead of calling the DB
             logger.info(f"🐲 Handling boss battle question: {submission.question_id}")
             question = generate_boss_battle_question(submission.game_state.selected_mastery)
@@ -931,11 +931,13 @@ def generate_fallback_hints(question_data: Dict[str, Any], wrong_advisor: str) -
     ]
     
     # Make sure the wrong advisor gives the wrong hint
+    wrong_character = {
+        "senior_dev": "alex_chen",
+        "security_lead": "maya_rodriguez",
+        "junior_dev": "jordan_kim"
+    }.get(wrong_advisor, "alex_chen")
     for hint in hints:
-        if hint["character"] == wrong_advisor.replace("_", "_"):
-            hint["is_correct"] = False
-        elif hint["is_correct"] == False and hint["character"] != wrong_advisor.replace("_", "_"):
-            hint["is_correct"] = True
+        hint["is_correct"] = hint["character"] != wrong_character
     
     return hints
 
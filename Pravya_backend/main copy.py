@@ -1,4 +1,5 @@
 import os
+import re
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from supabase import create_client, Client
@@ -40,6 +41,9 @@ class HintRequest(BaseModel):
     character_to_use: str
 
 # --- HELPER FUNCTIONS ---
+# First numeric token of an expected outcome, e.g. "42.5" in "Returns 42.5 runs."
+NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
 def check_for_achievements(state: TestState) -> str | None:
     if state.correct_streak == 1 and "Quick Off the Mark" not in state.badges:
         return "Quick Off the Mark"
@@ -76,8 +80,10 @@ def get_next_question(state: TestState):
             prev_q_res = supabase.table('questions').select('expected_outcome').eq('mastery', state.mastery).gte('difficulty_rating', 8).order('difficulty_rating').order('id').limit(1).offset(previous_question_index).execute()
             if prev_q_res.data:
                 expected_outcome = prev_q_res.data[0]['expected_outcome']
-                correct_val = ''.join(c for c in expected_outcome.split('.')[0] if c.isdigit() or c == '.')
-                if correct_val and correct_val in state.user_answer:
+                # Drop thousands separators first, as for the answer, so "1,500" stays 1500
+                match = NUMBER_RE.search(expected_outcome.replace(',', ''))
+                correct_val = match.group(0) if match else None
+                if correct_val and correct_val in state.user_answer.replace(',', ''):
                     was_previous_answer_correct = True
                     state.performance_score += 1
                     state.correct_streak += 1
@@ -1,15 +1,26 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import google.generativeai as genai
 import os
 from supabase import create_client, Client
-import json
+import asyncio
+import orjson
 import random
 import logging
 import re
 import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from async_lru import alru_cache
+try:
+    from math import fma
+except ImportError:  # math.fma is Python 3.13+
+    def fma(x: float, y: float, z: float) -> float:
+        return x * y + z
 from dotenv import load_dotenv
 load_dotenv()
 # Configure logging
@@ -17,7 +28,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI
-app = FastAPI(title="DevStorm Backend", version="1.0.0")
+# Serialize responses with orjson, they carry full narratives plus the nested GameState
+app = FastAPI(title="DevStorm Backend", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Compress responses over 1 KB, narratives and story continuations are prose-heavy
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
 
 # CORS middleware
 app.add_middleware(
@@ -47,9 +62,109 @@ except Exception as e:
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 logger.info(f"Gemini API Key configured: {'Yes' if GOOGLE_API_KEY else 'No'}")
 
+# Static instructions live in the system instruction so every request shares the
+# same prompt prefix and Gemini's prompt cache can hit; only game data varies per call
+NARRATIVE_SYSTEM_PROMPT = """
+You are a master storyteller creating an immersive tech thriller narrative. Generate a compelling scenario for the coding challenge you are given.
+
+STORY REQUIREMENTS:
+1. Create a urgent, realistic development crisis at NeoTech Corp
+2. The technical question must feel like a natural solution to the crisis
+3. Integrate team members naturally - make their dialogue feel authentic
+**For Mathematical quesiton, you can change the terminologies, but keep the numeric value same as the original question**
+**For example : You bought a book for $15, which was 75% of its original price. What was the original price?(original Question) to make it fit in story you can change book to petawatts of charge but keep the numeric value of 15 and 75%
+5. Build suspense about potential system infiltration by rogue AIs
+6. Keep narrative concise but engaging (max 100 words)
+7. End with the technical challenge that needs immediate solution
+** You should never ask the question in a direct way or at the end of your story narration, the question should be blended with the story narration, So that user have to read the story and find the question within it.**
+** Question information should be scattered in the entire narration, so that it does not feel like the story narration is useless, and the user simply reads the last paragraph of the narration to solve the question.**
+
+TONE: Professional but urgent, with underlying tension about AI threats
+"""
+
+EVAL_SYSTEM_PROMPT = """
+You are an expert code reviewer evaluating a developer's solution during a critical system emergency.
+
+EVALUATION CRITERIA:
+1. Correctness: Does the solution address the core problem?
+2. Code Quality: Is it readable, efficient, and following best practices?
+3. Completeness: Does it meet all requirements from expected outcome?
+4. Emergency Context: Is this solution deployable in a crisis situation?
+
+Respond with is_correct, an integer score from 0 to 100, and short feedback.
+"""
+
+CONTINUATION_SYSTEM_PROMPT = """
+You are continuing an immersive tech thriller story. Generate a realistic immediate reaction/consequence to the developer's solution attempt.
+
+STORY REQUIREMENTS:
+1. Write immediate consequence of the solution deployment (2-3 sentences max)
+2. Include realistic team member reactions based on outcome
+3. Show system status change (success/failure indicators)
+4. Build tension for next challenge if continuing
+5. If this was question 5/5, provide a satisfying session conclusion
+
+OUTCOME SCENARIOS:
+- exceptional: "System secured! Outstanding implementation!"
+- success: "Solution deployed successfully. Crisis contained."
+- partial_success: "Solution works but has minor issues. Monitoring required."
+- near_miss: "Solution partially failed. Quick patch needed."
+- failure: "Critical failure! System still compromised!"
+
+TONE: Immediate, realistic tech team communication during crisis
+"""
+
+BOSS_BATTLE_SYSTEM_PROMPT = """
+You are crafting the climactic boss battle scene of a tech thriller. This is the final confrontation!
+
+BOSS BATTLE SCENARIO:
+- The AI has revealed its true form and is making its final assault
+- This is a direct confrontation between human ingenuity and artificial corruption
+- The fate of NeoTech Corp and the digital realm hangs in the balance
+
+STORY REQUIREMENTS:
+1. Create an epic, cinematic opening to the boss battle (max 100 words)
+2. Show the boss AI taunting the player with corrupted code/logic
+3. Build maximum tension - this is the final showdown
+4. Include dramatic team support and rallying 
+5. End with the ultimate technical challenge that will determine victory
+
+TONE: Epic, high-stakes, cinematic boss battle with tech terminology
+"""
+
+HINTS_SYSTEM_PROMPT = """
+Generate three hints for the technical challenge below. ONE hint should be subtly wrong or misleading.
+
+CHARACTER PERSONAS:
+- Alex Chen (Senior Developer): Analytical, focuses on efficiency and best practices
+- Maya Rodriguez (Security Lead): Security-focused, thinks about vulnerabilities 
+- Jordan Kim (Junior Developer): Eager but sometimes overthinks, asks questions
+
+HINT REQUIREMENTS:
+1. Generate one hint from each character's perspective
+2. Two hints should be helpful and correct
+3. ONE hint (from the MISLEADING CHARACTER named below) should be SUBTLY wrong - not obviously bad, but misleading
+4. Each hint should be 1-2 sentences, in character voice
+5. The wrong hint should seem plausible but lead to issues
+
+Return as JSON array:
+[
+  {"character": "alex_chen", "hint": "...", "is_correct": true},
+  {"character": "maya_rodriguez", "hint": "...", "is_correct": true},  
+  {"character": "jordan_kim", "hint": "...", "is_correct": false}
+]
+
+Make the wrong hint subtle and believable!
+"""
+
 try:
     genai.configure(api_key=GOOGLE_API_KEY)
     model = genai.GenerativeModel('gemini-2.5-flash')
+    narrative_model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=NARRATIVE_SYSTEM_PROMPT)
+    evaluation_model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=EVAL_SYSTEM_PROMPT)
+    continuation_model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=CONTINUATION_SYSTEM_PROMPT)
+    boss_battle_model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=BOSS_BATTLE_SYSTEM_PROMPT)
+    hints_model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=HINTS_SYSTEM_PROMPT)
     logger.info("✅ Gemini AI client initialized successfully")
     
     # Test Gemini connection
@@ -58,6 +173,14 @@ try:
 except Exception as e:
     logger.error(f"❌ Failed to initialize Gemini: {str(e)}")
     model = None
+    narrative_model = None
+    evaluation_model = None
+    continuation_model = None
+    boss_battle_model = None
+    hints_model = None
+
+# Module-level RNG instance for question, advisor and repercussion picks
+rng = random.Random()
 
 # Pydantic models
 class GameState(BaseModel):
@@ -82,6 +205,10 @@ class AnswerSubmission(BaseModel):
     question_id: str
     time_taken: Optional[int] = None
 
+# Response models are built from server-produced data, so handlers use
+# model_construct and return an ORJSONResponse directly. That skips both the
+# constructor validation and FastAPI's re-validation against response_model,
+# which is kept for the OpenAPI schema.
 class StoryResponse(BaseModel):
     narrative: str
     question: Dict[str, Any]
@@ -102,6 +229,7 @@ class TrustDecision(BaseModel):
     game_state: GameState
     question_id: str
     trusted_teammate: str  # Which teammate's advice they trust
+    hints: Optional[List[Dict[str, Any]]] = None  # The hints /get_team_hints returned to this player
     
 class TrustDecisionResponse(BaseModel):
     is_correct_trust: bool
@@ -136,6 +264,26 @@ CHARACTERS = {
     }
 }
 
+# Teammate lookup tables, keyed by trust key unless noted
+CHARACTER_NAMES = {char_id: char["name"] for char_id, char in CHARACTERS.items()}
+HINT_PROMPT_NAMES = {
+    "senior_dev": "Alex Chen (Senior Developer)",
+    "security_lead": "Maya Rodriguez (Security Lead)",
+    "junior_dev": "Jordan Kim (Junior Developer)"
+}
+# Hints identify teammates by snake_cased name rather than trust key
+HINT_CHARACTER_KEYS = {
+    "senior_dev": "alex_chen",
+    "security_lead": "maya_rodriguez",
+    "junior_dev": "jordan_kim"
+}
+TRUST_KEYS_BY_HINT_CHARACTER = {hint_key: char_id for char_id, hint_key in HINT_CHARACTER_KEYS.items()}
+
+# Flattened character fields so the per-request reaction loops zip over tuples
+CHAR_IDS = tuple(CHARACTERS)
+CHAR_NAMES = tuple(CHARACTERS[char_id]["name"] for char_id in CHAR_IDS)
+CHAR_ROLES = tuple(CHARACTERS[char_id]["role"] for char_id in CHAR_IDS)
+
 # Story scenarios based on tech concepts
 SCENARIO_TEMPLATES = {
     "inheritance": "The legacy authentication system needs urgent refactoring. The old UserAccount class is being inherited by multiple subclasses, but they're not properly calling parent initialization.",
@@ -162,7 +310,7 @@ def get_question_from_db(difficulty_level: str, mastery: str) -> Dict[str, Any]:
         logger.info(f"📊 Database query result: {len(result.data) if result.data else 0} questions found")
         
         if result.data:
-            selected_question = random.choice(result.data)
+            selected_question = rng.choice(result.data)
             logger.info(f"✅ Selected question: {selected_question['id']}")
             return selected_question
         else:
@@ -170,7 +318,7 @@ def get_question_from_db(difficulty_level: str, mastery: str) -> Dict[str, Any]:
             logger.warning(f"⚠️ No questions found for {difficulty_level}-{mastery}, trying fallback")
             result = supabase.table("questions").select("*").eq("mastery", mastery).execute()
             if result.data:
-                selected_question = random.choice(result.data)
+                selected_question = rng.choice(result.data)
                 logger.info(f"✅ Fallback question selected: {selected_question['id']}")
                 return selected_question
             else:
@@ -181,8 +329,24 @@ def get_question_from_db(difficulty_level: str, mastery: str) -> Dict[str, Any]:
         logger.error(f"❌ Database error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@alru_cache(maxsize=1024, ttl=60)
+async def fetch_question(question_id: str) -> Dict[str, Any]:
+    """Fetch a single question row by id, cached briefly so one turn's
+    answer, hint and trust requests hit Supabase only once"""
+    # supabase-py is synchronous, keep it off the event loop
+    result = await asyncio.to_thread(
+        lambda: supabase.table("questions").select("*").eq("id", question_id).execute()
+    )
+    if not result.data:
+        raise HTTPException(status_code=404, detail=f"Question with ID '{question_id}' not found")
+    return result.data[0]
+
 def generate_boss_battle_question(mastery: str) -> Dict[str, Any]:
-    """Generate a boss battle question for the final challenge"""
+    """Generate a boss battle question for the final challenge
+
+    Boss question ids always start with "boss-"; submit_answer relies on that
+    prefix to serve them locally instead of querying Supabase.
+    """
     
     boss_questions = {
         "python": {
@@ -237,6 +401,12 @@ def determine_difficulty_progression(game_state: GameState) -> tuple:
     
     return difficulty, mastery
 
+# Score thresholds and the outcome bucket for each band, lowest band first
+CORRECT_OUTCOME_THRESHOLDS = (75, 90)
+CORRECT_OUTCOMES = ("partial_success", "success", "exceptional")
+WRONG_OUTCOME_THRESHOLDS = (50,)
+WRONG_OUTCOMES = ("failure", "near_miss")
+
 def generate_story_continuation(is_correct: bool, question_data: Dict[str, Any], game_state: GameState, user_answer: str, score: float) -> str:
     """Generate story continuation based on user's answer performance"""
     
@@ -244,32 +414,23 @@ def generate_story_continuation(is_correct: bool, question_data: Dict[str, Any],
     
     # Determine story outcome and team reactions
     if is_correct:
-        if score >= 90:
-            outcome_type = "exceptional"
-        elif score >= 75:
-            outcome_type = "success"
-        else:
-            outcome_type = "partial_success"
+        outcome_type = CORRECT_OUTCOMES[bisect_right(CORRECT_OUTCOME_THRESHOLDS, score)]
     else:
-        if score >= 50:
-            outcome_type = "near_miss"
-        else:
-            outcome_type = "failure"
+        outcome_type = WRONG_OUTCOMES[bisect_right(WRONG_OUTCOME_THRESHOLDS, score)]
     
     # Character reactions based on trust levels and outcome
     character_reactions = []
-    for char_id, trust in game_state.team_trust.items():
-        char = CHARACTERS[char_id]
+    team_trust = game_state.team_trust
+    for char_id, name in zip(CHAR_IDS, CHAR_NAMES):
+        trust = team_trust.get(char_id, 100.0)
         if trust > 80:
-            character_reactions.append(f"{char['name']} (trusted ally)")
+            character_reactions.append(f"{name} (trusted ally)")
         elif trust < 50:
-            character_reactions.append(f"{char['name']} (suspicious)")
+            character_reactions.append(f"{name} (suspicious)")
         else:
-            character_reactions.append(f"{char['name']} (neutral)")
+            character_reactions.append(f"{name} (neutral)")
     
     prompt = f"""
-You are continuing an immersive tech thriller story. Generate a realistic immediate reaction/consequence to the developer's solution attempt.
-
 CONTEXT:
 - Question: {question_data['title']} ({question_data['mastery']})
 - User's Performance: {outcome_type} (score: {score}/100)
@@ -277,32 +438,16 @@ CONTEXT:
 - Team Trust Levels: {', '.join(character_reactions)}
 - Current Streak: {game_state.streak_count}
 
-STORY REQUIREMENTS:
-1. Write immediate consequence of the solution deployment (2-3 sentences max)
-2. Include realistic team member reactions based on outcome
-3. Show system status change (success/failure indicators)
-4. Build tension for next challenge if continuing
-5. If this was question 5/5, provide a satisfying session conclusion
-
-OUTCOME SCENARIOS:
-- exceptional: "System secured! Outstanding implementation!"
-- success: "Solution deployed successfully. Crisis contained."
-- partial_success: "Solution works but has minor issues. Monitoring required."
-- near_miss: "Solution partially failed. Quick patch needed."
-- failure: "Critical failure! System still compromised!"
-
-TONE: Immediate, realistic tech team communication during crisis
-
 Generate the story continuation (max 150 words):
 """
 
     try:
         logger.info("🤖 Calling Gemini API for story continuation...")
-        if not model:
+        if not continuation_model:
             logger.error("❌ Gemini model not initialized for story continuation")
             return generate_fallback_story_continuation(is_correct, outcome_type, game_state)
             
-        response = model.generate_content(prompt)
+        response = continuation_model.generate_content(prompt)
         logger.info("✅ Story continuation generated successfully")
         logger.info(f"🟡Token count for story continuation is :{response.usage_metadata}")
         return response.text.strip()
@@ -340,58 +485,43 @@ def generate_immersive_narrative(question_data: Dict[str, Any], game_state: Game
     
     # Build character context based on trust levels
     character_context = ""
-    for char_id, trust in game_state.team_trust.items():
-        char = CHARACTERS[char_id]
+    team_trust = game_state.team_trust
+    for char_id, name, role in zip(CHAR_IDS, CHAR_NAMES, CHAR_ROLES):
+        trust = team_trust.get(char_id, 100.0)
         if trust < 50:
-            character_context += f"{char['name']} ({char['role']}) seems suspicious lately. "
+            character_context += f"{name} ({role}) seems suspicious lately. "
         elif trust > 90:
-            character_context += f"{char['name']} ({char['role']}) has your complete trust. "
+            character_context += f"{name} ({role}) has your complete trust. "
     
     prompt = f"""
-    You are a master storyteller creating an immersive tech thriller narrative. Generate a compelling scenario for this coding challenge:
-
-    CONTEXT:
-    - Player Level: {game_state.player_level}
-    - Performance Score: {game_state.performance_score}%
-    - Story Tension: {story_tension}
-    - Team Morale: {team_morale}
-    - Current Streak: {game_state.streak_count}
-    - Questions Answered: {game_state.session_questions_answered}
-
-    TECHNICAL CHALLENGE:
-    - Title: {question_data['title']}
-    - Mastery: {question_data['mastery']}
-    - Difficulty: {question_data['difficulty_level']}
-    - Original Question: {question_data['question_text']}
-
-    TEAM DYNAMICS:
-    {character_context}
-
-    STORY REQUIREMENTS:
-    1. Create a urgent, realistic development crisis at NeoTech Corp
-    2. The technical question must feel like a natural solution to the crisis
-    3. Integrate team members naturally - make their dialogue feel authentic
-    **For Mathematical quesiton, you can change the terminologies, but keep the numeric value same as the original question**
-    **For example : You bought a book for $15, which was 75% of its original price. What was the original price?(original Question) to make it fit in story you can change book to petawatts of charge but keep the numeric value of 15 and 75%
-    5. Build suspense about potential system infiltration by rogue AIs
-    6. Keep narrative concise but engaging (max 100 words)
-    7. End with the technical challenge that needs immediate solution
-    ** You should never ask the question in a direct way or at the end of your story narration, the question should be blended with the story narration, So that user have to read the story and find the question within it.**
-    ** Question information should be scattered in the entire narration, so that it does not feel like the story narration is useless, and the user simply reads the last paragraph of the narration to solve the question.**
-
-    TONE: Professional but urgent, with underlying tension about AI threats
-
-    Generate the narrative that leads naturally to the technical question:
-    """
+CONTEXT:
+- Player Level: {game_state.player_level}
+- Performance Score: {game_state.performance_score}%
+- Story Tension: {story_tension}
+- Team Morale: {team_morale}
+- Current Streak: {game_state.streak_count}
+- Questions Answered: {game_state.session_questions_answered}
+
+TECHNICAL CHALLENGE:
+- Title: {question_data['title']}
+- Mastery: {question_data['mastery']}
+- Difficulty: {question_data['difficulty_level']}
+- Original Question: {question_data['question_text']}
+
+TEAM DYNAMICS:
+{character_context}
+
+Generate the narrative that leads naturally to the technical question:
+"""
 
     try:
         logger.info("🤖 Calling Gemini API for narrative generation...")
-        if not model:
+        if not narrative_model:
             logger.error("❌ Gemini model not initialized")
 
     
     
-        response = model.generate_content(prompt)
+        response = narrative_model.generate_content(prompt)
         logger.info("✅ Gemini API call successful")
         logger.info(f"📝 Generated narrative length: {len(response.text)} characters")
         logger.info(f"🟡Token count is:{response.usage_metadata}")
@@ -413,37 +543,21 @@ def generate_boss_battle_narrative(question_data: Dict[str, Any], game_state: Ga
     boss_name = boss_names.get(question_data['mastery'], "The Code Destroyer")
     
     prompt = f"""
-    You are crafting the climactic boss battle scene of a tech thriller. This is the final confrontation!
-    
-    CONTEXT:
-    - Player has completed 4 challenges and proven their skills
-    - Performance Score: {game_state.performance_score}%
-    - Team Trust: {"High" if all(trust > 70 for trust in game_state.team_trust.values()) else "Mixed"}
-    - Final Boss: {boss_name}
-    
-    BOSS BATTLE SCENARIO:
-    - Title: {question_data['title']}
-    - The AI has revealed its true form and is making its final assault
-    - This is a direct confrontation between human ingenuity and artificial corruption
-    - The fate of NeoTech Corp and the digital realm hangs in the balance
-    
-    STORY REQUIREMENTS:
-    1. Create an epic, cinematic opening to the boss battle (max 100 words)
-    2. Show the boss AI taunting the player with corrupted code/logic
-    3. Build maximum tension - this is the final showdown
-    4. Include dramatic team support and rallying 
-    5. End with the ultimate technical challenge that will determine victory
-    
-    TONE: Epic, high-stakes, cinematic boss battle with tech terminology
-    
-    Generate the boss battle introduction:
-    """
+CONTEXT:
+- Player has completed 4 challenges and proven their skills
+- Performance Score: {game_state.performance_score}%
+- Team Trust: {"High" if all(trust > 70 for trust in game_state.team_trust.values()) else "Mixed"}
+- Final Boss: {boss_name}
+- Title: {question_data['title']}
+
+Generate the boss battle introduction:
+"""
 
     try:
-        if not model:
+        if not boss_battle_model:
             return f"🔥 **FINAL BOSS BATTLE!** {boss_name} emerges from the corrupted systems! This is your ultimate test - defeat the AI corruption with perfect code!"
             
-        response = model.generate_content(prompt)
+        response = boss_battle_model.generate_content(prompt)
         logger.info(f"🟡Token count for boss battle narrative is : {response.usage_metadata}")
         return response.text.strip()
     except Exception as e:
@@ -458,6 +572,20 @@ def generate_boss_battle_narrative(question_data: Dict[str, Any], game_state: Ga
         logger.error(f"❌ Gemini API call failed: {str(e)}")
         return f"URGENT: System crisis detected! {question_data['title']} requires immediate attention. {question_data['question_text']}"
 
+# Structured output for answer evaluation so Gemini returns a bare JSON object
+EVALUATION_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "object",
+        "properties": {
+            "is_correct": {"type": "boolean"},
+            "score": {"type": "integer"},
+            "feedback": {"type": "string"}
+        },
+        "required": ["is_correct", "score", "feedback"]
+    }
+}
+
 def evaluate_user_answer(user_answer: str, question_data: Dict[str, Any], game_state: GameState) -> tuple:
     """Use LLM to evaluate user's code/answer against expected outcome"""
     
@@ -465,8 +593,6 @@ def evaluate_user_answer(user_answer: str, question_data: Dict[str, Any], game_s
     logger.info(f"📝 Answer length: {len(user_answer)} characters")
     
     prompt = f"""
-You are an expert code reviewer evaluating a developer's solution during a critical system emergency.
-
 ORIGINAL CHALLENGE:
 {question_data['question_text']}
 
@@ -475,22 +601,11 @@ EXPECTED SOLUTION CRITERIA:
 
 USER'S SUBMITTED SOLUTION:
 {user_answer}
-
-EVALUATION CRITERIA:
-1. Correctness: Does the solution address the core problem?
-2. Code Quality: Is it readable, efficient, and following best practices?
-3. Completeness: Does it meet all requirements from expected outcome?
-4. Emergency Context: Is this solution deployable in a crisis situation?
-
-You MUST respond with ONLY a valid JSON object in this exact format (no extra text, no markdown formatting):
-{{"is_correct": true, "score": 85, "feedback": "Solution correctly implements the required functionality with good coding practices."}}
-
-The JSON must be valid and parseable. Do not include any text before or after the JSON.
 """
 
     try:
         logger.info("🤖 Calling Gemini API for answer evaluation...")
-        if not model:
+        if not evaluation_model:
             logger.error("❌ Gemini model not initialized for evaluation")
             # Fallback evaluation
             is_correct = len(user_answer.strip()) > 10
@@ -498,60 +613,19 @@ The JSON must be valid and parseable. Do not include any text before or after th
             feedback = f"Emergency evaluation complete. {'Solution accepted' if is_correct else 'Solution needs revision'} - API unavailable"
             return is_correct, score, feedback
             
-        response = model.generate_content(prompt)
+        response = evaluation_model.generate_content(prompt, generation_config=EVALUATION_GENERATION_CONFIG)
         logger.info(f"🟡Token count for evaluation is : {response.usage_metadata}")
         logger.info("✅ Gemini evaluation API call successful")
         logger.info(f"📋 Raw response: {response.text[:200]}...")  # Log first 200 chars
         
-        # Clean up the response text
-        response_text = response.text.strip()
+        # The response schema guarantees a bare JSON object, no fences or prose
+        evaluation = orjson.loads(response.text)
+        is_correct = evaluation['is_correct']
+        score = evaluation['score']
+        feedback = evaluation['feedback']
+        logger.info(f"📊 Evaluation result: correct={is_correct}, score={score}")
         
-        # Remove any markdown formatting
-        if response_text.startswith('```json'):
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        elif response_text.startswith('```'):
-            response_text = response_text.replace('```', '').strip()
-        
-        # Find the JSON object in the response
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        
-        if start_idx != -1 and end_idx > start_idx:
-            json_text = response_text[start_idx:end_idx]
-            logger.info(f"📊 Extracted JSON: {json_text}")
-            
-            try:
-                evaluation = json.loads(json_text)
-                logger.info(f"📊 Evaluation result: correct={evaluation.get('is_correct', False)}, score={evaluation.get('score', 0)}")
-                
-                # Validate required fields
-                is_correct = evaluation.get('is_correct', False)
-                score = evaluation.get('score', 0)
-                feedback = evaluation.get('feedback', 'Evaluation completed')
-                
-                return is_correct, score, feedback
-                
-            except json.JSONDecodeError as json_error:
-                logger.error(f"❌ JSON parsing failed: {str(json_error)}")
-                logger.error(f"📋 Problematic JSON: {json_text}")
-                
-                # Try to extract basic info from text response
-                is_correct = 'true' in response_text.lower() or 'correct' in response_text.lower()
-                
-                # Extract score if possible
-                import re
-                score_match = re.search(r'"score":\s*(\d+)', response_text)
-                score = int(score_match.group(1)) if score_match else (80 if is_correct else 40)
-                
-                feedback = "Solution evaluated - see detailed analysis above"
-                return is_correct, score, feedback
-        else:
-            logger.error("❌ No valid JSON found in response")
-            # Fallback evaluation based on content analysis
-            is_correct = len(user_answer.strip()) > 10 and ('=' in user_answer or 'def' in user_answer)
-            score = 75 if is_correct else 25
-            feedback = "Emergency evaluation: Basic syntax check completed"
-            return is_correct, score, feedback
+        return is_correct, score, feedback
             
     except Exception as e:
         logger.error(f"❌ Gemini evaluation failed: {str(e)}")
@@ -587,70 +661,102 @@ def analyze_code_quality(user_answer: str, question_data: Dict[str, Any]) -> boo
     except Exception:
         return len(user_answer.strip()) > 10
 
-def update_game_state_after_answer(game_state: GameState, is_correct: bool, score: float) -> GameState:
-    """Update game state based on answer evaluation"""
+# Total XP needed per level (XP is cumulative and whole-numbered; scores are truncated)
+LEVEL_XP_STEP = 200
+
+# Exponential smoothing weights for the rolling performance score
+PERFORMANCE_ALPHA = 0.2
+PERFORMANCE_DECAY = 1.0 - PERFORMANCE_ALPHA
+
+def shift_team_trust(team_trust: Dict[str, float], delta: float) -> Dict[str, float]:
+    """Return a new trust dict with every teammate shifted by delta, clamped to 0-100"""
+    return {char: min(100.0, max(0.0, trust + delta)) for char, trust in team_trust.items()}
+
+def update_game_state_after_answer(game_state: GameState, is_correct: bool, score: float) -> tuple:
+    """Update game state based on answer evaluation, returning (updated_state, newly_awarded_badges)"""
     
     try:
-        # Create a new GameState object with updated values
-        updated_state = GameState(
-            player_level=game_state.player_level,
-            experience_points=game_state.experience_points,
-            current_question_index=game_state.current_question_index,
-            performance_score=game_state.performance_score,
-            streak_count=game_state.streak_count,
-            badges=list(game_state.badges),  # Create new list
-            team_trust=dict(game_state.team_trust),  # Create new dict
-            story_path=game_state.story_path,
-            boss_battle_ready=game_state.boss_battle_ready,
-            session_questions_answered=game_state.session_questions_answered,
-            selected_mastery=game_state.selected_mastery
-        )
+        # Work on locals and write everything back in one shallow model_copy
+        experience_points = game_state.experience_points
+        player_level = game_state.player_level
+        boss_battle_ready = game_state.boss_battle_ready
+        badges = game_state.badges.copy()
         
         # Update experience and streak
         if is_correct:
-            updated_state.experience_points += int(score)
-            updated_state.streak_count += 1
+            experience_points += int(score)
+            streak = game_state.streak_count + 1
             # Boost team trust slightly
-            for char in updated_state.team_trust:
-                updated_state.team_trust[char] = min(100.0, updated_state.team_trust[char] + 2.0)
+            team_trust = shift_team_trust(game_state.team_trust, 2.0)
         else:
-            updated_state.streak_count = 0
+            streak = 0
             # Decrease team trust slightly
-            for char in updated_state.team_trust:
-                updated_state.team_trust[char] = max(0.0, updated_state.team_trust[char] - 5.0)
+            team_trust = shift_team_trust(game_state.team_trust, -5.0)
         
         # Update performance score (rolling average)
-        updated_state.performance_score = (updated_state.performance_score * 0.8) + (score * 0.2)
+        performance_score = fma(score, PERFORMANCE_ALPHA, game_state.performance_score * PERFORMANCE_DECAY)
         
-        # Level progression
-        xp_for_next_level = updated_state.player_level * 200
-        if updated_state.experience_points >= xp_for_next_level:
-            updated_state.player_level += 1
-            updated_state.boss_battle_ready = True
+        # Level progression: level L is left at L * LEVEL_XP_STEP total XP, so the
+        # earned level is a floor division and big awards can span several levels
+        earned_level = experience_points // LEVEL_XP_STEP + 1
+        if earned_level > player_level:
+            player_level = earned_level
+            boss_battle_ready = True
         
-        # Badge system
+        # Badge system: collect qualifying badges first (the streak ones are mutually
+        # exclusive), and only build the ownership set when something qualified.
+        # Badges stay a list to keep earn order for the UI.
         new_badges = []
-        if updated_state.streak_count == 3 and "code_warrior" not in updated_state.badges:
+        if streak == 3:
             new_badges.append("code_warrior")
-        if updated_state.streak_count == 5 and "debugging_master" not in updated_state.badges:
+        elif streak == 5:
             new_badges.append("debugging_master")
-        if score >= 95 and "perfectionist" not in updated_state.badges:
+        if score >= 95:
             new_badges.append("perfectionist")
-        if updated_state.performance_score >= 90 and "elite_developer" not in updated_state.badges:
+        if performance_score >= 90:
             new_badges.append("elite_developer")
         
-        updated_state.badges.extend(new_badges)
-        updated_state.current_question_index += 1
-        updated_state.session_questions_answered += 1
+        if new_badges:
+            owned_badges = set(badges)
+            new_badges = [badge for badge in new_badges if badge not in owned_badges]
+            badges.extend(new_badges)
         
-        logger.info(f"🎮 Game state updated: XP={updated_state.experience_points}, Level={updated_state.player_level}, Performance={updated_state.performance_score:.1f}%")
+        updated_state = game_state.model_copy(update={
+            "experience_points": experience_points,
+            "player_level": player_level,
+            "boss_battle_ready": boss_battle_ready,
+            "streak_count": streak,
+            "performance_score": performance_score,
+            "team_trust": team_trust,
+            "badges": badges,
+            "current_question_index": game_state.current_question_index + 1,
+            "session_questions_answered": game_state.session_questions_answered + 1
+        })
         
-        return updated_state
+        logger.info(f"🎮 Game state updated: XP={experience_points}, Level={player_level}, Performance={performance_score:.1f}%")
+        
+        return updated_state, new_badges
         
     except Exception as e:
         logger.error(f"❌ Error updating game state: {str(e)}")
         # Return original state if update fails
-        return game_state
+        return game_state, []
+
+# Generic question phrasing -> story-specific phrasing, applied in one regex pass.
+# Longest phrases first so "Provide an example" wins over the bare "example".
+QUESTION_ADAPTATIONS = {
+    "Provide an example": "Show how you would implement this for our crisis",
+    "example": "NeoTech system"
+}
+QUESTION_ADAPTATION_RE = re.compile(
+    "|".join(map(re.escape, sorted(QUESTION_ADAPTATIONS, key=len, reverse=True)))
+)
+
+@app.on_event("startup")
+async def configure_executor():
+    # Supabase and Gemini calls are blocking; give asyncio.to_thread enough
+    # workers that concurrent players don't queue behind each other
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=32))
 
 @app.get("/")
 async def root():
@@ -675,28 +781,27 @@ async def get_next_question(request: QuestionRequest):
         
         # Get appropriate question
         difficulty, mastery = determine_difficulty_progression(game_state)
-        question_data = get_question_from_db(difficulty, mastery)
+        question_data = await asyncio.to_thread(get_question_from_db, difficulty, mastery)
         
         if not question_data:
             raise HTTPException(status_code=404, detail="No suitable question found")
         
         # Generate immersive narrative
         if is_boss_battle:
-            narrative = generate_boss_battle_narrative(question_data, game_state)
+            narrative = await asyncio.to_thread(generate_boss_battle_narrative, question_data, game_state)
         else:
             init_time = time.time()
-            narrative = generate_immersive_narrative(question_data, game_state)
+            narrative = await asyncio.to_thread(generate_immersive_narrative, question_data, game_state)
             end_time = time.time()
             total_duration = end_time - init_time
             logger.info(f"⏲️Total time taken for API call to generate new scenario is:{total_duration}")
         
         # Adapt question text to story context
-        adapted_question = question_data['question_text']
-        # Replace generic terms with story-specific ones
-        adapted_question = adapted_question.replace("example", "NeoTech system")
-        adapted_question = adapted_question.replace("Provide an example", "Show how you would implement this for our crisis")
+        adapted_question = QUESTION_ADAPTATION_RE.sub(
+            lambda match: QUESTION_ADAPTATIONS[match.group(0)], question_data['question_text']
+        )
         
-        response = StoryResponse(
+        response = StoryResponse.model_construct(
             narrative=narrative,
             question={
                 "id": question_data["id"],
@@ -712,7 +817,7 @@ async def get_next_question(request: QuestionRequest):
             time_limit=time_limit
         )
         
-        return response
+        return ORJSONResponse(response.model_dump())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating question: {str(e)}")
@@ -724,20 +829,18 @@ async def submit_answer(submission: AnswerSubmission):
     try:
         question = None
         # Check if the question is a boss battle question
-        if "boss" in submission.question_id:
+        if submission.question_id.startswith("boss-"):
             # If so, generate the question data locally instead of calling the DB
             logger.info(f"🐲 Handling boss battle question: {submission.question_id}")
             question = generate_boss_battle_question(submission.game_state.selected_mastery)
         else:
             # Otherwise, fetch the question from Supabase
-            question_data = supabase.table("questions").select("*").eq("id", submission.question_id).execute()
-            if not question_data.data:
-                raise HTTPException(status_code=404, detail=f"Question with ID '{submission.question_id}' not found")
-            question = question_data.data[0]
+            question = await fetch_question(submission.question_id)
 
         init_time = time.time()
         # Evaluate answer using LLM
-        is_correct, score, feedback = evaluate_user_answer(
+        is_correct, score, feedback = await asyncio.to_thread(
+            evaluate_user_answer,
             submission.user_answer, 
             question, 
             submission.game_state
@@ -747,7 +850,7 @@ async def submit_answer(submission: AnswerSubmission):
         logger.info(f"⏲️Total time taken for API call to evaluate user answer:{total_duration}" )
         
         # Update game state
-        updated_game_state = update_game_state_after_answer(
+        updated_game_state, new_badges = update_game_state_after_answer(
             submission.game_state, 
             is_correct, 
             score
@@ -756,7 +859,8 @@ async def submit_answer(submission: AnswerSubmission):
         
         # Generate story continuation
         init_time_scenario = time.time()
-        story_continuation = generate_story_continuation(
+        story_continuation = await asyncio.to_thread(
+            generate_story_continuation,
             is_correct,
             question,
             updated_game_state,
@@ -769,15 +873,12 @@ async def submit_answer(submission: AnswerSubmission):
         logger.info(f"Complete ⏲️Total time taken Eval + new scenario generation is {total_duration+total_duration_scenario}" )
         
         # Check for new achievements
-        achievement_unlocked = None
-        if len(updated_game_state.badges) > len(submission.game_state.badges):
-            new_badges = set(updated_game_state.badges) - set(submission.game_state.badges)
-            achievement_unlocked = list(new_badges)[0]
+        achievement_unlocked = new_badges[0] if new_badges else None
         
         # Check if session is complete (5 questions answered)
         session_complete = updated_game_state.session_questions_answered >= 5
         
-        response = EvaluationResponse(
+        response = EvaluationResponse.model_construct(
             is_correct=bool(is_correct),
             score=float(score),
             feedback=str(feedback),
@@ -787,7 +888,7 @@ async def submit_answer(submission: AnswerSubmission):
             session_complete=bool(session_complete)
         )
         
-        return response
+        return ORJSONResponse(response.model_dump())
 
     # Improved exception handling
     except HTTPException as http_exc:
@@ -798,73 +899,41 @@ async def submit_answer(submission: AnswerSubmission):
         # Return a proper HTTP 500 error instead of letting the function crash
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
         
+# Outermost JSON array in the hints response (greedy, spans newlines)
+HINTS_JSON_RE = re.compile(r"\[.*\]", re.DOTALL)
+
 def generate_team_hints(question_data: Dict[str, Any], game_state: GameState) -> List[Dict[str, Any]]:
     """Generate hints from all three teammates - one will be deliberately wrong"""
     
     logger.info(f"💡 Generating team hints for question: {question_data['id']}")
     
     # Determine which teammate gives wrong advice (randomly)
-    wrong_advisors = ["senior_dev", "security_lead", "junior_dev"]
-    wrong_advisor = random.choice(wrong_advisors)
+    wrong_advisor = rng.choice(CHAR_IDS)
     logger.info(f"🎭 Wrong advisor selected: {wrong_advisor}")
     
-    # Map to character names for LLM prompt
-    advisor_to_character = {
-        "senior_dev": "Alex Chen (Senior Developer)",
-        "security_lead": "Maya Rodriguez (Security Lead)",
-        "junior_dev": "Jordan Kim (Junior Developer)"
-    }
-    
-    wrong_character_name = advisor_to_character[wrong_advisor]
+    wrong_character_name = HINT_PROMPT_NAMES[wrong_advisor]
     
     prompt = f"""
-Generate three hints for this technical challenge. ONE hint should be subtly wrong or misleading.
-
 QUESTION:
 {question_data['question_text']}
 
 EXPECTED SOLUTION:
 {question_data['expected_outcome']}
 
-CHARACTER PERSONAS:
-- Alex Chen (Senior Developer): Analytical, focuses on efficiency and best practices
-- Maya Rodriguez (Security Lead): Security-focused, thinks about vulnerabilities 
-- Jordan Kim (Junior Developer): Eager but sometimes overthinks, asks questions
-
-HINT REQUIREMENTS:
-1. Generate one hint from each character's perspective
-2. Two hints should be helpful and correct
-3. ONE hint (from {wrong_character_name}) should be SUBTLY wrong - not obviously bad, but misleading
-4. Each hint should be 1-2 sentences, in character voice
-5. The wrong hint should seem plausible but lead to issues
-
-Return as JSON array:
-[
-  {{"character": "alex_chen", "hint": "...", "is_correct": true}},
-  {{"character": "maya_rodriguez", "hint": "...", "is_correct": true}},  
-  {{"character": "jordan_kim", "hint": "...", "is_correct": false}}
-]
-
-Make the wrong hint subtle and believable!
+MISLEADING CHARACTER: {wrong_character_name}
 """
 
     try:
-        if not model:
+        if not hints_model:
             return generate_fallback_hints(question_data, wrong_advisor)
             
-        response = model.generate_content(prompt)
-        hints_text = response.text.strip()
-        
-        # Clean and parse JSON
-        if hints_text.startswith('```json'):
-            hints_text = hints_text.replace('```json', '').replace('```', '').strip()
+        response = hints_model.generate_content(prompt)
         
-        start_idx = hints_text.find('[')
-        end_idx = hints_text.rfind(']') + 1
+        # Pull the JSON array out of any markdown fences or prose in one pass
+        json_match = HINTS_JSON_RE.search(response.text)
         
-        if start_idx != -1 and end_idx > start_idx:
-            json_text = hints_text[start_idx:end_idx]
-            hints = json.loads(json_text)
+        if json_match:
+            hints = orjson.loads(json_match.group(0))
             
             # Validate and ensure we have exactly one wrong hint
             wrong_count = sum(1 for hint in hints if not hint.get('is_correct', True))
@@ -885,14 +954,7 @@ Make the wrong hint subtle and believable!
 def generate_fallback_hints(question_data: Dict[str, Any], wrong_advisor: str) -> List[Dict[str, Any]]:
     """Fallback hint generation when LLM fails"""
     
-    # Map wrong_advisor key to character name
-    advisor_mapping = {
-        "senior_dev": "alex_chen",
-        "security_lead": "maya_rodriguez", 
-        "junior_dev": "jordan_kim"
-    }
-    
-    wrong_character = advisor_mapping.get(wrong_advisor, "alex_chen")
+    wrong_character = HINT_CHARACTER_KEYS.get(wrong_advisor, "alex_chen")
     
     hints = [
         {
@@ -914,36 +976,36 @@ def generate_fallback_hints(question_data: Dict[str, Any], wrong_advisor: str) -
     
     # Make sure the wrong advisor gives the wrong hint
     for hint in hints:
-        if hint["character"] == wrong_character:
-            hint["is_correct"] = False
-        elif hint["is_correct"] == False and hint["character"] != wrong_character:
-            hint["is_correct"] = True
+        hint["is_correct"] = hint["character"] != wrong_character
     
     logger.info(f"🎭 Fallback hints generated with {wrong_character} as wrong advisor")
     return hints
 
+# Wrong-trust repercussions; the index picks both the message and its effect
+REPERCUSSION_MISDIRECTION, REPERCUSSION_TEAM_TENSION, REPERCUSSION_POOR_JUDGMENT = range(3)
+TRUST_REPERCUSSIONS = (
+    "⚠️ **Misdirection!** {name}'s advice led you astray. You waste precious mental energy second-guessing yourself.",
+    "💔 **Team Tension!** The other teammates exchange worried glances after you trusted {name}'s flawed advice. Team confidence drops.",
+    "🎯 **Poor Judgment!** Following {name}'s suggestion shows questionable decision-making. Your confidence wavers for the upcoming challenge."
+)
+
 @app.post("/get_team_hints", response_model=HintResponse)
 async def get_team_hints(request: HintRequest):
     """Get hints from all three teammates"""
     
     try:
         # Get question data
-        question_data = supabase.table("questions").select("*").eq("id", request.question_id).execute()
-        
-        if not question_data.data:
-            raise HTTPException(status_code=404, detail="Question not found")
-        
-        question = question_data.data[0]
+        question = await fetch_question(request.question_id)
         
         # Generate hints
-        hints = generate_team_hints(question, request.game_state)
+        hints = await asyncio.to_thread(generate_team_hints, question, request.game_state)
         
-        response = HintResponse(
+        response = HintResponse.model_construct(
             hints=hints,
             updated_game_state=request.game_state  # No changes for getting hints
         )
         
-        return response
+        return ORJSONResponse(response.model_dump())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating hints: {str(e)}")
@@ -955,16 +1017,12 @@ async def submit_trust_decision(decision: TrustDecision):
     try:
         logger.info(f"🤝 Processing trust decision: trusted={decision.trusted_teammate}")
         
-        # Get question data
-        question_data = supabase.table("questions").select("*").eq("id", decision.question_id).execute()
-        
-        if not question_data.data:
-            raise HTTPException(status_code=404, detail="Question not found")
-        
-        question = question_data.data[0]
-        
-        # Generate hints to determine correct choice
-        hints = generate_team_hints(question, decision.game_state)
+        # Judge against the hints this player was shown, echoed back by the client.
+        # Keeping them server-side would tie the decision to one worker process, and
+        # regenerating would pick a new random wrong advisor.
+        hints = decision.hints
+        if not hints:
+            raise HTTPException(status_code=400, detail="No team hints to judge the decision against")
         
         # Find if trusted teammate gave correct advice
         trusted_hint = None
@@ -979,40 +1037,15 @@ async def submit_trust_decision(decision: TrustDecision):
         
         is_correct_trust = trusted_hint["is_correct"]
         
-        # Create updated game state
-        updated_game_state = GameState(
-            player_level=decision.game_state.player_level,
-            experience_points=decision.game_state.experience_points,
-            current_question_index=decision.game_state.current_question_index,
-            performance_score=decision.game_state.performance_score,
-            streak_count=decision.game_state.streak_count,
-            badges=list(decision.game_state.badges),
-            team_trust=dict(decision.game_state.team_trust),
-            story_path=decision.game_state.story_path,
-            boss_battle_ready=decision.game_state.boss_battle_ready,
-            session_questions_answered=decision.game_state.session_questions_answered,
-            selected_mastery=decision.game_state.selected_mastery
-        )
+        # The request's state is parsed fresh per call and never reused, so mutate it directly
+        updated_game_state = decision.game_state
         
-        # Map character names to trust keys
-        character_to_trust_key = {
-            "alex_chen": "senior_dev",
-            "maya_rodriguez": "security_lead", 
-            "jordan_kim": "junior_dev"
-        }
-        
-        trust_key = character_to_trust_key.get(decision.trusted_teammate)
+        trust_key = TRUST_KEYS_BY_HINT_CHARACTER.get(decision.trusted_teammate)
         if not trust_key:
             logger.error(f"❌ No trust key mapping for: {decision.trusted_teammate}")
             raise HTTPException(status_code=400, detail=f"Invalid character: {decision.trusted_teammate}")
         
-        character_names = {
-            "alex_chen": "Alex Chen",
-            "maya_rodriguez": "Maya Rodriguez",
-            "jordan_kim": "Jordan Kim"
-        }
-        
-        character_name = character_names.get(decision.trusted_teammate, decision.trusted_teammate)
+        character_name = CHARACTER_NAMES[trust_key]
         
         if is_correct_trust:
             # Trusted the right person - minor benefits
@@ -1024,22 +1057,14 @@ async def submit_trust_decision(decision: TrustDecision):
                     updated_game_state.team_trust[trust_key] + 5.0)
         else:
             # Trusted the wrong person - apply repercussions
-            repercussions = [
-                f"⚠️ **Misdirection!** {character_name}'s advice led you astray. You waste precious mental energy second-guessing yourself.",
-                f"💔 **Team Tension!** The other teammates exchange worried glances after you trusted {character_name}'s flawed advice. Team confidence drops.", 
-                f"🎯 **Poor Judgment!** Following {character_name}'s suggestion shows questionable decision-making. Your confidence wavers for the upcoming challenge."
-            ]
-            
-            chosen_repercussion = random.choice(repercussions)
-            consequences = chosen_repercussion
+            repercussion = rng.randrange(len(TRUST_REPERCUSSIONS))
+            consequences = TRUST_REPERCUSSIONS[repercussion].format(name=character_name)
             
             # Apply consequences to game state
-            if "tension" in chosen_repercussion.lower() or "confidence drops" in chosen_repercussion.lower():
+            if repercussion == REPERCUSSION_TEAM_TENSION:
                 # Reduce all trust levels
-                for teammate in updated_game_state.team_trust:
-                    updated_game_state.team_trust[teammate] = max(0.0, 
-                        updated_game_state.team_trust[teammate] - 8.0)
-            elif "confidence wavers" in chosen_repercussion.lower():
+                updated_game_state.team_trust = shift_team_trust(updated_game_state.team_trust, -8.0)
+            elif repercussion == REPERCUSSION_POOR_JUDGMENT:
                 # Performance penalty for next question
                 updated_game_state.performance_score = max(0.0, 
                     updated_game_state.performance_score - 3.0)
@@ -1051,14 +1076,16 @@ async def submit_trust_decision(decision: TrustDecision):
         
         logger.info(f"✅ Trust decision processed: correct={is_correct_trust}")
         
-        response = TrustDecisionResponse(
-            is_correct_trust=is_correct_trust,
+        response = TrustDecisionResponse.model_construct(
+            is_correct_trust=bool(is_correct_trust),
             consequences=consequences,
             updated_game_state=updated_game_state
         )
         
-        return response
+        return ORJSONResponse(response.model_dump())
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error processing trust decision: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing trust decision: {str(e)}")
@@ -0,0 +1,11 @@
+-- Covering index for the story backend's per-mastery ordering query:
+--   select id, expected_outcome, difficulty_rating from questions
+--   where mastery = $1 and difficulty_rating >= 8 order by difficulty_rating, id
+-- The key order matches the ORDER BY, so Postgres skips the sort, and
+-- INCLUDE (expected_outcome) makes it an index-only scan.
+create index if not exists idx_questions_mastery_diff_id
+    on questions (mastery, difficulty_rating, id) include (expected_outcome);
+
+-- main.py picks questions by mastery and difficulty_level.
+create index if not exists idx_questions_mastery_level
+    on questions (mastery, difficulty_level);
@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+
+import httpx
+import orjson
+import streamlit as st
+
+# Story and hint generation can take a while; only connecting should fail fast
+TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# One HTTP/2 client per backend, kept across reruns and user sessions, so every
+# call multiplexes over the same warm TCP+TLS connection.
+@st.cache_resource
+def get_client(base_url: str) -> httpx.Client:
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=2,  # connection failures only
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+    )
+    return httpx.Client(base_url=base_url, transport=transport, timeout=TIMEOUT)
+
+# Payloads carry the player's code answer; orjson encodes them in C
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Gateway errors from a stalled backend are retried with backoff, for GETs only:
+# a 504 on a POST usually means the backend is still generating (or has
+# finished), and replaying it would pay for the generation or submit twice
+RETRY_STATUSES = frozenset({502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+
+# After this many consecutive failures, calls short-circuit for a few seconds
+# instead of piling more requests onto a backend that is already struggling.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 5.0
+
+class BackendUnavailable(httpx.TransportError):
+    """Raised without a request while the circuit breaker is open."""
+
+_breaker_lock = threading.Lock()
+_failure_count = 0
+_last_failure = 0.0
+
+def _breaker_open() -> bool:
+    with _breaker_lock:
+        return (_failure_count >= BREAKER_THRESHOLD
+                and time.monotonic() - _last_failure < BREAKER_COOLDOWN)
+
+def _record(success: bool) -> None:
+    global _failure_count, _last_failure
+    with _breaker_lock:
+        if success:
+            _failure_count = 0
+        else:
+            _failure_count += 1
+            _last_failure = time.monotonic()
+
+def _send(client: httpx.Client, endpoint: str, payload: dict | None) -> httpx.Response:
+    if payload is not None:
+        return client.post(f"/{endpoint}", content=orjson.dumps(payload), headers=JSON_HEADERS)
+    for attempt in range(MAX_RETRIES + 1):
+        response = client.get(f"/{endpoint}")
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        time.sleep(BACKOFF_FACTOR * 2 ** attempt)
+
+def fetch_json(base_url: str, endpoint: str, payload: dict | None = None):
+    """GET endpoint, or POST payload as JSON. Raises httpx.HTTPError on failure."""
+    if _breaker_open():
+        raise BackendUnavailable(f"Backend unavailable, skipping /{endpoint} for now")
+    client = get_client(base_url)
+    try:
+        response = _send(client, endpoint, payload)
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        # Client errors (e.g. 422) say nothing about backend health
+        _record(e.response.status_code < 500)
+        raise
+    except httpx.HTTPError:
+        _record(False)
+        raise
+    _record(True)
+    return orjson.loads(response.content)
+
+def stream_json_lines(base_url: str, endpoint: str, payload: dict):
+    """POST payload and yield each NDJSON line as it arrives. Raises httpx.HTTPError on failure.
+
+    Not retried: once lines have been yielded the caller has already rendered them.
+    """
+    if _breaker_open():
+        raise BackendUnavailable(f"Backend unavailable, skipping /{endpoint} for now")
+    client = get_client(base_url)
+    try:
+        with client.stream("POST", f"/{endpoint}", content=orjson.dumps(payload), headers=JSON_HEADERS) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield orjson.loads(line)
+    except httpx.HTTPStatusError as e:
+        _record(e.response.status_code < 500)
+        raise
+    except httpx.HTTPError:
+        _record(False)
+        raise
+    _record(True)
+
+# Idempotent lookups (masteries, hints) keyed by endpoint and canonical payload.
+# Errors propagate, so failed calls are never cached.
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_json_cached(base_url: str, endpoint: str, payload_json: str | None = None):
+    return fetch_json(base_url, endpoint, None if payload_json is None else json.loads(payload_json))
+
+def canonical_json(payload: dict | None) -> str | None:
+    return None if payload is None else json.dumps(payload, sort_keys=True)
@@ -1,35 +1,116 @@
 # --- START OF FILE app.py ---
 
 import streamlit as st
-import requests
+import httpx
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from api_client import canonical_json, fetch_json, fetch_json_cached, stream_json_lines
 
 # --- CONFIGURATION ---
 BACKEND_URL = "http://127.0.0.1:8000" # Ensure this is your correct Render URL
 
+# One script serves every protocol variant, so they share the client and caches:
+#   ?mode=story|imposter|boss_battle  skips the protocol picker
+#   ?hints=1                          enables lore hints (backends serving /get-narrative-hint)
+GAME_MODES = ("story", "imposter", "boss_battle")
+FIXED_MODE = st.query_params.get("mode") if st.query_params.get("mode") in GAME_MODES else None
+HINTS_ENABLED = st.query_params.get("hints") == "1"
+
 # --- API HELPER ---
-def get_api_data(endpoint, payload=None):
+def get_api_data(endpoint, payload=None, cached=False):
     try:
-        url = f"{BACKEND_URL}/{endpoint}"
-        if payload is None:
-            response = requests.get(url)
-        else:
-            response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        if cached:
+            return fetch_json_cached(BACKEND_URL, endpoint, canonical_json(payload))
+        return fetch_json(BACKEND_URL, endpoint, payload)
+    except httpx.HTTPError as e:
+        st.error(f"Comms Failure: Cannot connect to the Aegis server. The connection is unstable. Error: {e}", icon="📡")
+        return None
+
+def stream_turn(state_to_send, story_slot):
+    """Submit a turn to the NDJSON endpoint, writing the chapter into story_slot as it is generated.
+
+    Returns the same shape as /get-next-question, or None on failure.
+    """
+    try:
+        events = stream_json_lines(BACKEND_URL, "get-next-question/stream", state_to_send)
+        response = next(events)
+        if response.get("status") == "in_progress":
+            def narrative():
+                for event in events:
+                    if "reset" in event:
+                        return  # generation failed mid-chapter, the partial text is stale
+                    if "narrative" in event:
+                        yield event["narrative"]
+                    else:
+                        response.update(event)
+            with story_slot.container():
+                st.write_stream(narrative())
+            for event in events:  # only reached after a reset
+                response.update(event)
+            if "story_payload" in response:
+                story_slot.markdown(response["story_payload"].get("narrative_chapter", ""), unsafe_allow_html=True)
+        return response
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:  # backend without the streaming endpoint
+            return get_api_data("get-next-question", state_to_send)
         st.error(f"Comms Failure: Cannot connect to the Aegis server. The connection is unstable. Error: {e}", icon="📡")
         return None
+    except httpx.HTTPError as e:
+        st.error(f"Comms Failure: Cannot connect to the Aegis server. The connection is unstable. Error: {e}", icon="📡")
+        return None
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4)
+
+def request_hint_in_background(hint_payload):
+    """Start the hint request off the script thread; show_pending_hint renders it when ready"""
+    ctx = get_script_run_ctx()
+
+    def fetch(payload_json):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch_json_cached(BACKEND_URL, "get-narrative-hint", payload_json)
+
+    future = get_executor().submit(fetch, canonical_json(hint_payload))
+    st.session_state.pending_hint = (hint_payload["question_text"], future)
+
+def show_pending_hint(question_text, render):
+    """Poll the background hint from inside the mission fragment; render(hint_text) once it arrives"""
+    pending = st.session_state.get("pending_hint")
+    if pending is None or pending[0] != question_text:
+        return
+    future = pending[1]
+    if not future.done():
+        st.caption("Whispers from beyond the veil...")
+        time.sleep(0.3)
+        st.rerun(scope="fragment")
+    del st.session_state.pending_hint
+    try:
+        render(future.result().get('hint_text'))
+    except httpx.HTTPError as e:
+        st.error(f"Comms Failure: Cannot connect to the Aegis server. The connection is unstable. Error: {e}", icon="📡")
 
 # --- UI RENDERING ---
 def render_selection_screen():
     st.title("Project Umbra: The Aegis Protocol 👁️")
     st.markdown("You are a Technomancer, our last line of defense against reality-bending threats. Your code is the only thing holding back the darkness. Welcome to Project Umbra.")
-    masteries = get_api_data("masteries")
+    masteries = get_api_data("masteries", cached=True)
     if masteries:
         options = ["-- Select your field of expertise --"] + masteries.get("masteries", [])
         selected_mastery = st.selectbox("Select Your Field of Expertise:", options=options)
 
-        if selected_mastery != "-- Select your field of expertise --":
+        if selected_mastery != "-- Select your field of expertise --" and FIXED_MODE:
+            if st.button("Begin the Ritual", type="primary"):
+                st.session_state.clear()
+                st.session_state.view = 'test'
+                st.session_state.mastery = selected_mastery
+                st.session_state.game_mode = FIXED_MODE
+                st.rerun()
+
+        elif selected_mastery != "-- Select your field of expertise --":
             st.markdown("---")
             st.subheader("Select a Simulation Protocol")
 
@@ -94,19 +175,47 @@ def render_test_screen():
         st.error("Data stream corrupted by paranormal interference. Please refresh the terminal.")
         return
 
+    # Check for mission completion or failure
+    agent_sanity = st.session_state.get('agent_sanity', 100)
+    if st.session_state.current_data.get("status") == "completed":
+        if agent_sanity <= 0:
+            st.error("CONTAINMENT LOST. REALITY UNRAVELING.", icon="💀")
+            st.header("You have been lost to the madness.")
+        else:
+            st.balloons()
+            st.success("CONTAINMENT RE-ESTABLISHED ✅")
+            st.header("The anomaly is stabilized. The world is safe... for now.")
+        
+        st.subheader("Final Log - Secured Artifacts:")
+        for artifact in st.session_state.get("artifacts", []):
+            st.markdown(f"📜 **{artifact}**")
+        if st.button("Begin a New Protocol"):
+            st.session_state.clear()
+            st.rerun()
+        return
+
     # Dynamic title based on game mode
     mode = st.session_state.get('game_mode', 'story').replace('_', ' ').title()
     st.title(f"Aegis Protocol: {mode} 👁️")
 
+    render_mission_panels(mode)
 
+
+# Submitting an answer only changes these panels, so it reruns just this
+# fragment; a full rerun is reserved for the switch to the completion screen.
+@st.fragment
+def render_mission_panels(mode):
     # --- MAIN UI LAYOUT ---
     col1, col2 = st.columns([2.2, 1])
-    story_payload = st.session_state.current_data.get("story_payload", {})
-    agent_sanity = st.session_state.get('agent_sanity', 100)
+    ss = st.session_state
+    story_payload = ss.current_data.get("story_payload", {})
+    agent_sanity = ss.get('agent_sanity', 100)
+    artifacts = ss.get('artifacts', [])
     character = "Director Thorne" if agent_sanity > 60 else "Dr. Aris Thorne"
 
     with col1:
-        st.markdown(story_payload.get("narrative_chapter", "Receiving fragmented transmission..."), unsafe_allow_html=True)
+        story_slot = st.empty()
+        story_slot.markdown(story_payload.get("narrative_chapter", "Receiving fragmented transmission..."), unsafe_allow_html=True)
         st.warning(f"**Implied Goal:** {story_payload.get('call_to_action', 'Decipher the anomaly.')}")
         
         user_input = st.text_area("Input your counter-ritual (code):", height=200, key="user_answer_input")
@@ -114,43 +223,59 @@ def render_test_screen():
         if st.button("Execute Counter-Ritual", type="primary"):
             with st.spinner("Casting incantation..."):
                 state_to_send = {
-                    'mastery': st.session_state.mastery,
-                    'game_mode': st.session_state.game_mode,
-                    'current_question_index': st.session_state.get('current_question_index', 0),
-                    'artifacts': st.session_state.get('artifacts', []),
+                    'mastery': ss.mastery,
+                    'game_mode': ss.game_mode,
+                    'artifacts': artifacts,
                     'agent_sanity': agent_sanity,
-                    'correct_streak': st.session_state.get('correct_streak', 0),
+                    'correct_streak': ss.get('correct_streak', 0),
                     'user_answer': user_input,
-                    'current_question_index': st.session_state.get('current_question_index', 0) + 1
+                    'current_question_index': ss.get('current_question_index', 0) + 1
                 }
 
-                response = get_api_data("get-next-question", state_to_send)
+                response = stream_turn(state_to_send, story_slot)
                 if response:
                     new_artifacts = response.get("updated_state", {}).get("artifacts", [])
-                    old_artifacts = st.session_state.get("artifacts", [])
-                    for artifact in new_artifacts:
-                        if artifact not in old_artifacts:
-                            st.toast(f"Artifact Secured: {artifact}!", icon="📜")
+                    old_artifacts = set(artifacts)
+                    secured = [artifact for artifact in new_artifacts if artifact not in old_artifacts]
+                    if secured:
+                        st.toast(f"Artifact{'s' if len(secured) > 1 else ''} Secured: {', '.join(secured)}!", icon="📜")
                     
-                    st.session_state.current_data = response
-                    st.session_state.update(response.get("updated_state", {}))
-                st.rerun()
+                    ss.current_data = response
+                    ss.update(response.get("updated_state", {}))
+                    if response.get("status") == "completed":
+                        st.rerun()
+                st.rerun(scope="fragment")
 
     with col2:
         with st.container(border=True):
             st.subheader("Containment Status")
             st.metric("Agent Sanity", f"{agent_sanity}%")
-            st.markdown(f"**Comms:** {character}")
+            if agent_sanity <= 60:
+                 st.markdown(f"**Comms:** <span style='color: red;'>**{character} (Unstable)**</span>", unsafe_allow_html=True)
+            else:
+                 st.markdown(f"**Comms:** {character}")
             st.markdown(f"**Protocol:** {mode}")
             
             st.markdown("**Secured Artifacts:**")
-            artifacts = st.session_state.get('artifacts', [])
             if not artifacts:
                 st.caption("No artifacts secured.")
             else:
                 for artifact in artifacts:
                     st.markdown(f"📜 **{artifact}**")
 
+            if HINTS_ENABLED:
+                st.markdown("---")
+                question_details = story_payload.get("question_details", {})
+                if st.button("Consult Forbidden Lore (Hint)"):
+                    if question_details:
+                        hint_payload = {"question_text": question_details.get("question_text", ""), "character_to_use": character}
+                        request_hint_in_background(hint_payload)
+                    else:
+                        st.error("The artifact remains silent.")
+                show_pending_hint(
+                    question_details.get("question_text", ""),
+                    lambda hint_text: st.info(f"A voice whispers: \"*{hint_text}*\"")
+                )
 
 # --- MAIN ROUTER ---
 if 'view' not in st.session_state:
@@ -1,10 +1,13 @@
 import streamlit as st
-import requests
-import json
-from typing import Dict, Any, Optional
+import httpx
+from typing import Dict, Any, List, Optional, Tuple
 import time
-from datetime import datetime
-import base64
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from api_client import fetch_json
 
 # Page configuration
 st.set_page_config(
@@ -15,8 +18,7 @@ st.set_page_config(
 )
 
 # Custom CSS for immersive theme
-def load_custom_css():
-    st.markdown("""
+CUSTOM_CSS = """
     <style>
     /* Dark tech theme */
     .stApp {
@@ -142,13 +144,18 @@ def load_custom_css():
     footer {visibility: hidden;}
     header {visibility: hidden;}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def load_custom_css():
+    # Streamlit rebuilds the page on every rerun, so the style block must be
+    # emitted each run; keeping it a module constant avoids any per-run work
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 def initialize_session_state():
     if 'game_state' not in st.session_state:
         st.session_state.game_state = {
-            'user_id': f"player_{int(time.time())}",
+            'user_id': f"player_{secrets.token_hex(8)}",
             'current_question_id': None,
             'score': 0,
             'level': 1,
@@ -180,32 +187,88 @@ def initialize_session_state():
 # API Configuration
 API_BASE_URL = "http://127.0.0.1:8000"  # Replace with your backend URL
 
+# ?debug=1 adds the debug-submit pre-flight and payload dumps to each submission
+DEBUG_MODE = st.query_params.get("debug") == "1"
+
 def make_api_request(endpoint: str, data: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
     """Make API request to backend with error handling"""
     try:
-        url = f"{API_BASE_URL}/{endpoint}"
-        if data:
-            response = requests.post(url, json=data, timeout=30)
-        else:
-            response = requests.get(url, timeout=30)
-        
-        response.raise_for_status()
-        return response.json()
+        return fetch_json(API_BASE_URL, endpoint, data or None)
     
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 422:
             # Don't show error here, let the calling function handle it
             raise e
         else:
             st.error(f"API Error {e.response.status_code}: {e.response.text}")
             return None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         st.error(f"Connection Error: {str(e)}")
         return None
     except Exception as e:
         st.error(f"Unexpected error: {str(e)}")
         return None
 
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4)
+
+def make_api_requests(specs: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[Optional[Dict[str, Any]]]:
+    """Run independent make_api_request calls concurrently, results in spec order"""
+    ctx = get_script_run_ctx()
+
+    def run(endpoint, data):
+        # Attach the script context so st.error inside make_api_request still renders
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return make_api_request(endpoint, data)
+
+    futures = [get_executor().submit(run, endpoint, data) for endpoint, data in specs]
+    return [future.result() for future in futures]
+
+# Guild options
+GUILDS = {
+    "Frontend Mystic": {
+        "description": "Masters of UI/UX magic and visual spells. Specializes in React, JavaScript, CSS, and user interface enchantments.",
+        "icon": "🎨",
+        "color": "#ff6b6b"
+    },
+    "Backend Paladin": {
+        "description": "Defenders of data integrity and system architecture. Champions of Python, databases, APIs, and security fortifications.",
+        "icon": "🛡️",
+        "color": "#4ecdc4"
+    },
+    "Algorithm Assassin": {
+        "description": "Speed and efficiency specialists. Masters of mathematics, algorithms, optimization, and computational warfare.",
+        "icon": "⚡",
+        "color": "#ffd93d"
+    },
+    "DevOps Shaman": {
+        "description": "Infrastructure summoners and deployment ritualists. Experts in cloud magic, monitoring spells, and system automation.",
+        "icon": "☁️",
+        "color": "#6c5ce7"
+    }
+}
+
+# The cards are static, so their HTML is built once per server process
+@st.cache_resource
+def guild_cards() -> List[Tuple[str, str]]:
+    return [
+        (guild_name, f"""
+            <div class='main-content' style='border-color: {guild_info["color"]}; min-height: 200px;'>
+            <h3 style='color: {guild_info["color"]}; text-align: center;'>
+            {guild_info["icon"]} {guild_name}
+            </h3>
+            <p style='text-align: center; margin: 15px 0;'>{guild_info["description"]}</p>
+            </div>
+            """)
+        for guild_name, guild_info in GUILDS.items()
+    ]
+
+# Runs before the rerun the click triggers, so no second st.rerun() pass is needed
+def join_guild(guild_name: str):
+    st.session_state.game_state['guild'] = guild_name
+    st.session_state.game_started = True
+
 # Guild selection screen
 def show_guild_selection():
     st.markdown("<h1 style='text-align: center; color: #00ff88;'>⚔️ Welcome to CodeRealm Chronicles ⚔️</h1>", unsafe_allow_html=True)
@@ -220,52 +283,17 @@ def show_guild_selection():
     </div>
     """, unsafe_allow_html=True)
     
-    # Guild options
-    guilds = {
-        "Frontend Mystic": {
-            "description": "Masters of UI/UX magic and visual spells. Specializes in React, JavaScript, CSS, and user interface enchantments.",
-            "icon": "🎨",
-            "color": "#ff6b6b"
-        },
-        "Backend Paladin": {
-            "description": "Defenders of data integrity and system architecture. Champions of Python, databases, APIs, and security fortifications.",
-            "icon": "🛡️",
-            "color": "#4ecdc4"
-        },
-        "Algorithm Assassin": {
-            "description": "Speed and efficiency specialists. Masters of mathematics, algorithms, optimization, and computational warfare.",
-            "icon": "⚡",
-            "color": "#ffd93d"
-        },
-        "DevOps Shaman": {
-            "description": "Infrastructure summoners and deployment ritualists. Experts in cloud magic, monitoring spells, and system automation.",
-            "icon": "☁️",
-            "color": "#6c5ce7"
-        }
-    }
-    
     # Display guild cards
     cols = st.columns(2)
     
-    guild_names = list(guilds.keys())
-    for i, guild_name in enumerate(guild_names):
-        guild_info = guilds[guild_name]
+    for i, (guild_name, card_html) in enumerate(guild_cards()):
         col = cols[i % 2]
         
         with col:
-            st.markdown(f"""
-            <div class='main-content' style='border-color: {guild_info["color"]}; min-height: 200px;'>
-            <h3 style='color: {guild_info["color"]}; text-align: center;'>
-            {guild_info["icon"]} {guild_name}
-            </h3>
-            <p style='text-align: center; margin: 15px 0;'>{guild_info["description"]}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(card_html, unsafe_allow_html=True)
             
-            if st.button(f"Join {guild_name}", key=f"guild_{guild_name}", use_container_width=True):
-                st.session_state.game_state['guild'] = guild_name
-                st.session_state.game_started = True
-                st.rerun()
+            st.button(f"Join {guild_name}", key=f"guild_{guild_name}", use_container_width=True,
+                      on_click=join_guild, args=(guild_name,))
 
 # Main game interface
 def show_game_interface():
@@ -341,12 +369,11 @@ def show_badges():
     
     if badges:
         st.markdown("### 🏆 Achievements")
-        for badge in badges:
-            st.markdown(f"""
-            <div class='achievement' style='margin: 5px 0; padding: 8px; font-size: 14px;'>
-            🏆 {badge}
-            </div>
-            """, unsafe_allow_html=True)
+        # One markdown element for all badges instead of one per badge
+        st.markdown("\n".join(
+            f"<div class='achievement' style='margin: 5px 0; padding: 8px; font-size: 14px;'>🏆 {badge}</div>"
+            for badge in badges
+        ), unsafe_allow_html=True)
 
 def start_new_mission():
     """Start a new regular mission"""
@@ -459,8 +486,15 @@ def show_text_input_interface():
             else:
                 st.error("Please enter your answer first!")
 
+# Anything longer is pasted noise, not a solution; reject it before the round trip
+MAX_ANSWER_LENGTH = 16_384
+
 def submit_answer(user_answer: str):
     """Submit user's answer to backend"""
+    if len(user_answer) > MAX_ANSWER_LENGTH:
+        st.error(f"Solution too long! Keep it under {MAX_ANSWER_LENGTH:,} characters.")
+        return
+    
     time_taken = None
     if st.session_state.question_start_time:
         time_taken = int(time.time() - st.session_state.question_start_time)
@@ -473,21 +507,25 @@ def submit_answer(user_answer: str):
     }
     
     # Debug: Show what we're sending
-    with st.expander("🐛 Debug Info (Click to expand)", expanded=False):
-        st.write("**Sending to backend:**")
-        st.json(submission_data)
+    if DEBUG_MODE:
+        with st.expander("🐛 Debug Info (Click to expand)", expanded=False):
+            st.write("**Sending to backend:**")
+            st.json(submission_data)
     
     with st.spinner("🔄 Processing your solution..."):
         try:
-            # First try the debug endpoint to see if data is valid
-            debug_response = make_api_request("debug-submit", submission_data)
-            if debug_response:
-                st.success("✅ Data format is valid")
-            
-            # Now submit the actual answer
-            response = make_api_request("submit-answer", submission_data)
+            if DEBUG_MODE:
+                # Validate against the debug endpoint and submit the answer concurrently
+                debug_response, response = make_api_requests([
+                    ("debug-submit", submission_data),
+                    ("submit-answer", submission_data),
+                ])
+                if debug_response:
+                    st.success("✅ Data format is valid")
+            else:
+                response = make_api_request("submit-answer", submission_data)
             
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             if e.response.status_code == 422:
                 st.error("❌ Data validation error (422)")
                 st.error("This usually means there's a mismatch in the data format.")
@@ -500,8 +538,9 @@ def submit_answer(user_answer: str):
                     st.error(f"Raw error: {e.response.text}")
                     
                 # Show what we tried to send
-                st.write("**Data we tried to send:**")
-                st.json(submission_data)
+                if DEBUG_MODE:
+                    st.write("**Data we tried to send:**")
+                    st.json(submission_data)
                 return
             else:
                 st.error(f"❌ HTTP Error {e.response.status_code}: {e.response.text}")
@@ -583,6 +622,9 @@ def reset_current_mission():
     st.session_state.game_state['boss_battle_active'] = False
     st.session_state.game_state['imposter_mode_active'] = False
 
+def dismiss_achievement():
+    st.session_state.show_achievement = None
+
 def show_achievement_notification():
     """Display achievement notification"""
     st.markdown(f"""
@@ -591,9 +633,7 @@ def show_achievement_notification():
     </div>
     """, unsafe_allow_html=True)
     
-    if st.button("✨ Awesome!", use_container_width=True):
-        st.session_state.show_achievement = None
-        st.rerun()
+    st.button("✨ Awesome!", use_container_width=True, on_click=dismiss_achievement)
 
 # Main app logic
 def main():
@@ -1,8 +1,11 @@
 import streamlit as st
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from typing import Dict, Any
 import time
+import secrets
 
 # Page configuration
 st.set_page_config(
@@ -15,8 +18,31 @@ st.set_page_config(
 # Backend URL (adjust for your deployment)
 BACKEND_URL = "http://localhost:8000"  # Change to your Render URL when deployed
 
+# One script serves both DevStorm layouts:
+#   default     conversational mission log (backends returning story_continuation)
+#   ?classic=1  single scenario card with a separate answer panel
+CONVERSATIONAL = st.query_params.get("classic") != "1"
+
+# (connect, read): fail fast when the backend is unreachable, allow slow generation
+REQUEST_TIMEOUT = (3.05, 27)
+
+# One pooled keep-alive session per server process. cache_resource keeps it
+# alive across reruns, so repeat calls skip the TCP/TLS handshake.
+@st.cache_resource
+def get_session() -> requests.Session:
+    session = requests.Session()
+    # Connection failures are retried (nothing was sent); POSTs are never
+    # replayed after the backend may have seen them
+    retry = Retry(total=2, connect=2, read=0, backoff_factor=0.25)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Bodies are pre-encoded with orjson and sent as data=
+    session.headers["Content-Type"] = "application/json"
+    return session
+
 # Custom CSS for immersive UI
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
@@ -95,7 +121,9 @@ st.markdown("""
         border: 1px solid #dee2e6;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 def initialize_game_state():
@@ -118,6 +146,10 @@ def initialize_game_state():
             "selected_mastery": "python"  # Default selection
         }
     
+    # Identifies this playthrough; a restart clears session_state and gets a new one
+    if 'game_id' not in st.session_state:
+        st.session_state.game_id = secrets.token_hex(8)
+    
     if 'current_question' not in st.session_state:
         st.session_state.current_question = None
     
@@ -151,76 +183,111 @@ def display_header():
     </div>
     """, unsafe_allow_html=True)
 
+STAT_CARD_HTML = """
+        <div class="stat-card">
+            <h4 style="color: {color};">{title}</h4>
+            <p style="color: #6c757d;">{body}</p>
+        </div>
+        """
+
+MASTERY_DISPLAY = {
+    "python": "🐍 Python",
+    "react": "⚛️ React",
+    "mathematics": "📐 Mathematics"
+}
+
+# (minimum trust, bar color), highest band first
+TRUST_COLORS = ((80, "#28a745"), (60, "#ffc107"), (0, "#dc3545"))
+
+def trust_color(trust: float) -> str:
+    for threshold, color in TRUST_COLORS:
+        if trust >= threshold:
+            return color
+    return TRUST_COLORS[-1][1]
+
+DIFFICULTY_COLORS = {"easy": "#28a745", "medium": "#ffc107", "hard": "#dc3545"}
+
+MEMBER_NAMES = {
+    "senior_dev": "Alex Chen",
+    "security_lead": "Maya Rodriguez",
+    "junior_dev": "Jordan Kim"
+}
+
+BADGE_NAMES = {
+    "code_warrior": "Code Warrior",
+    "debugging_master": "Debug Master",
+    "perfectionist": "Perfectionist",
+    "elite_developer": "Elite Dev"
+}
+
+def trust_bar_html(member: str, trust: float) -> str:
+    return f"""
+            <div style="margin: 0.5rem 0;">
+                <strong style="color: #ffffff;">{MEMBER_NAMES.get(member, member)}</strong><br>
+                <div style="background: #e9ecef; border-radius: 10px; height: 20px; overflow: hidden;">
+                    <div style="background: {trust_color(trust)}; height: 100%; width: {trust}%; transition: width 0.3s;"></div>
+                </div>
+                <small style="color: #6c757d;">{trust:.0f}% trust</small>
+            </div>
+            """
+
 def display_stats_sidebar():
     with st.sidebar:
         st.markdown("### 📊 Mission Status")
         
         game_state = st.session_state.game_state
         
-        # Player stats
-        st.markdown(f"""
-        <div class="stat-card">
-            <h4 style="color: #212529;">Developer Level: {game_state['player_level']}</h4>
-            <p style="color: #6c757d;">XP: {game_state['experience_points']}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
         # Performance indicator
         performance_color = "#28a745" if game_state['performance_score'] >= 70 else "#ffc107" if game_state['performance_score'] >= 50 else "#dc3545"
-        st.markdown(f"""
-        <div class="stat-card">
-            <h4 style="color: {performance_color}">Performance: {game_state['performance_score']:.1f}%</h4>
-            <p style="color: #6c757d;">Current Streak: {game_state['streak_count']}</p>
-        </div>
-        """, unsafe_allow_html=True)
         
         # Selected mastery
-        mastery_display = {
-            "python": "🐍 Python",
-            "react": "⚛️ React",
-            "mathematics": "📐 Mathematics"
-        }.get(game_state['selected_mastery'], game_state['selected_mastery'])
+        mastery_display = MASTERY_DISPLAY.get(game_state['selected_mastery'], game_state['selected_mastery'])
         
-        st.markdown(f"""
-        <div class="stat-card">
-            <h4 style="color: #2196f3;">Specialization</h4>
-            <p style="color: #6c757d;">{mastery_display}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # Player stats, performance and specialization cards in one element
+        st.markdown("".join([
+            STAT_CARD_HTML.format_map({
+                "color": "#212529",
+                "title": f"Developer Level: {game_state['player_level']}",
+                "body": f"XP: {game_state['experience_points']}"
+            }),
+            STAT_CARD_HTML.format_map({
+                "color": performance_color,
+                "title": f"Performance: {game_state['performance_score']:.1f}%",
+                "body": f"Current Streak: {game_state['streak_count']}"
+            }),
+            STAT_CARD_HTML.format_map({
+                "color": "#2196f3",
+                "title": "Specialization",
+                "body": mastery_display
+            })
+        ]), unsafe_allow_html=True)
         
         # Team trust levels
         st.markdown("### 🤝 Team Trust")
-        for member, trust in game_state['team_trust'].items():
-            trust_color = "#28a745" if trust >= 80 else "#ffc107" if trust >= 60 else "#dc3545"
-            member_name = {
-                "senior_dev": "Alex Chen",
-                "security_lead": "Maya Rodriguez", 
-                "junior_dev": "Jordan Kim"
-            }.get(member, member)
-            
-            st.markdown(f"""
-            <div style="margin: 0.5rem 0;">
-                <strong style="color: #ffffff;">{member_name}</strong><br>
-                <div style="background: #e9ecef; border-radius: 10px; height: 20px; overflow: hidden;">
-                    <div style="background: {trust_color}; height: 100%; width: {trust}%; transition: width 0.3s;"></div>
-                </div>
-                <small style="color: #6c757d;">{trust:.0f}% trust</small>
-            </div>
-            """, unsafe_allow_html=True)
+        # One markdown element for the whole team instead of one per member
+        st.markdown("".join(
+            trust_bar_html(member, trust) for member, trust in game_state['team_trust'].items()
+        ), unsafe_allow_html=True)
         
         # Badges
         if game_state['badges']:
             st.markdown("### 🏆 Achievements")
-            badge_names = {
-                "code_warrior": "Code Warrior",
-                "debugging_master": "Debug Master",
-                "perfectionist": "Perfectionist",
-                "elite_developer": "Elite Dev"
-            }
             
-            for badge in game_state['badges']:
-                badge_display = badge_names.get(badge, badge.replace('_', ' ').title())
-                st.markdown(f'<span class="achievement-badge">{badge_display}</span>', unsafe_allow_html=True)
+            # One markdown element for all badges instead of one per badge
+            st.markdown("\n\n".join(
+                f'<span class="achievement-badge">{BADGE_NAMES.get(badge, badge.replace("_", " ").title())}</span>'
+                for badge in game_state['badges']
+            ), unsafe_allow_html=True)
+
+# Button callbacks run before the rerun their click triggers, so the page
+# renders the new state straight away without a second st.rerun() pass.
+def select_mastery(mastery: str):
+    st.session_state.game_state['selected_mastery'] = mastery
+    st.session_state.mastery_selected = True
+
+def reset_session():
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
 
 def display_mastery_selection():
     """Display subject selection interface"""
@@ -243,10 +310,7 @@ def display_mastery_selection():
             <p>Master Python programming, algorithms, data structures, and backend development challenges.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose Python", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "python"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose Python", use_container_width=True, type="primary", on_click=select_mastery, args=("python",))
     
     with col2:
         st.markdown("""
@@ -255,10 +319,7 @@ def display_mastery_selection():
             <p>Tackle React components, state management, hooks, and frontend architecture problems.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose React", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "react"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose React", use_container_width=True, type="primary", on_click=select_mastery, args=("react",))
     
     with col3:
         st.markdown("""
@@ -267,10 +328,7 @@ def display_mastery_selection():
             <p>Solve complex mathematical problems, algorithms, statistics, and computational challenges.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose Mathematics", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "mathematics"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose Mathematics", use_container_width=True, type="primary", on_click=select_mastery, args=("mathematics",))
     
     st.markdown("---")
     st.markdown("""
@@ -284,24 +342,36 @@ def display_mastery_selection():
     
     return False
 
+# Asking again for the same turn of the same playthrough (a rerun, a double
+# click) returns the alert already generated instead of a fresh LLM call.
+# Only game_id and state_key are hashed; the backend advances
+# current_question_index on every submit, so each turn gets its own entry.
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def fetch_question(game_id: str, state_key: tuple, _game_state: Dict[str, Any]) -> Dict[str, Any]:
+    response = get_session().post(
+        f"{BACKEND_URL}/get_next_question",
+        data=orjson.dumps({"game_state": _game_state}),
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
 def get_next_question():
     """Fetch next question from backend"""
+    gs = st.session_state.game_state
+    state_key = (gs["player_level"], gs["current_question_index"], gs["selected_mastery"], gs["boss_battle_ready"])
     try:
         with st.spinner("🔄 Analyzing system breach..."):
-            response = requests.post(
-                f"{BACKEND_URL}/get_next_question",
-                json={"game_state": st.session_state.game_state},
-                timeout=30
-            )
+            data = fetch_question(st.session_state.game_id, state_key, gs)
         
-        if response.status_code == 200:
-            data = response.json()
-            st.session_state.current_question = data['question']
-            st.session_state.current_narrative = data['narrative']
-            st.session_state.urgency_level = data.get('urgency_level', 'medium')
-            st.session_state.is_boss_battle = data.get('is_boss_battle', False)
-            st.session_state.time_limit = data.get('time_limit')
-            st.session_state.waiting_for_question = False
+        st.session_state.current_question = data['question']
+        st.session_state.current_narrative = data['narrative']
+        st.session_state.urgency_level = data.get('urgency_level', 'medium')
+        st.session_state.is_boss_battle = data.get('is_boss_battle', False)
+        st.session_state.time_limit = data.get('time_limit')
+        st.session_state.waiting_for_question = False
+        
+        if CONVERSATIONAL:
             st.session_state.awaiting_answer = True
             
             # Add narrative to conversation history
@@ -311,12 +381,11 @@ def get_next_question():
                 "question": data['question'],
                 "timestamp": time.time()
             })
-            
-            return True
-        else:
-            st.error(f"Failed to get question: {response.text}")
-            return False
-            
+        
+        return True
+    except requests.exceptions.HTTPError as e:
+        st.error(f"Failed to get question: {e.response.text}")
+        return False
     except requests.exceptions.RequestException as e:
         st.error(f"Connection error: {str(e)}")
         return False
@@ -324,21 +393,25 @@ def get_next_question():
 def submit_answer(user_answer: str):
     """Submit user's answer for evaluation"""
     try:
-        with st.spinner("🔍 Deploying solution..."):
-            response = requests.post(
+        with st.spinner("🔍 Deploying solution..." if CONVERSATIONAL else "🔍 Analyzing your solution..."):
+            response = get_session().post(
                 f"{BACKEND_URL}/submit_answer",
-                json={
+                data=orjson.dumps({
                     "game_state": st.session_state.game_state,
                     "user_answer": user_answer,
                     "question_id": st.session_state.current_question['id']
-                },
-                timeout=30
+                }),
+                timeout=REQUEST_TIMEOUT
             )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             st.session_state.game_state = data['updated_game_state']
             
+            if not CONVERSATIONAL:
+                show_evaluation(data)
+                return True
+            
             # Add user answer to conversation history
             st.session_state.conversation_history.append({
                 "type": "user_answer",
@@ -380,6 +453,159 @@ def submit_answer(user_answer: str):
         st.error(f"Connection error: {str(e)}")
         return False
 
+def show_evaluation(data: Dict[str, Any]):
+    """Classic layout: confirm with a toast and move straight on to the next alert"""
+    st.toast(f"Score: {data['score']:.0f}/100", icon="✅" if data['is_correct'] else "❌")
+    
+    # display_last_result renders the full report on the next run
+    st.session_state.last_result = data
+    
+    # Reset for next question
+    st.session_state.waiting_for_question = True
+    st.session_state.user_answer = ""
+    st.rerun()
+
+def display_last_result():
+    """Classic layout: report the previous evaluation once, above the next-alert button"""
+    data = st.session_state.pop('last_result', None)
+    if not data:
+        return
+    
+    # Display evaluation results
+    if data['is_correct']:
+        st.success(f"✅ Solution Deployed Successfully! Score: {data['score']:.0f}/100")
+    else:
+        st.error(f"❌ Solution Failed Deployment. Score: {data['score']:.0f}/100")
+    
+    st.info(f"**Team Feedback:** {data['feedback']}")
+    
+    # Show achievement if unlocked
+    if data['achievement_unlocked']:
+        st.balloons()
+        st.success(f"🏆 Achievement Unlocked: {data['achievement_unlocked'].replace('_', ' ').title()}!")
+
+def display_current_scenario():
+    """Display current crisis scenario and question"""
+    
+    if st.session_state.waiting_for_question:
+        display_last_result()
+        if st.button("🚨 Analyze Next System Alert", type="primary", use_container_width=True):
+            if get_next_question():
+                st.rerun()
+        return
+    
+    # Display narrative with urgency styling
+    urgency_class = "urgency-critical" if st.session_state.get('urgency_level') == 'critical' else ""
+    
+    if st.session_state.get('is_boss_battle'):
+        st.markdown(f"""
+        <div class="crisis-alert {urgency_class}">
+            <h3>🔥 BOSS BATTLE: AI INFILTRATION DETECTED 🔥</h3>
+            <p>{st.session_state.current_narrative}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown(f"""
+        <div class="crisis-alert {urgency_class}">
+            <h3>🚨 SYSTEM ALERT: {st.session_state.current_question['title']}</h3>
+            <p>{st.session_state.current_narrative}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Display question details
+    question = st.session_state.current_question
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        st.markdown("### 💻 Technical Implementation Required:")
+        st.markdown(f"**Severity Level:** {question['difficulty'].upper()}")
+        st.markdown(f"**System Component:** {question['mastery'].title()}")
+        
+        # Question text in a code-like container
+        st.markdown(f"""
+        <div class="mission-briefing">
+            <strong>Mission Briefing:</strong><br>
+            {question['text']}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        # Time pressure indicator
+        if st.session_state.get('time_limit'):
+            st.markdown(f"""
+            <div class="crisis-alert">
+                <h4>⏰ Time Limit</h4>
+                <p>{st.session_state.time_limit // 60}:{st.session_state.time_limit % 60:02d}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Difficulty indicator
+        difficulty_color = DIFFICULTY_COLORS.get(question['difficulty'], "#6c757d")
+        st.markdown(f"""
+        <div class="stat-card">
+            <h4 style="color: {difficulty_color}">Threat Level</h4>
+            <p style="color: #6c757d;">{question['difficulty_rating']}/100</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+@st.fragment
+def display_answer_interface():
+    """Display code/answer submission interface"""
+    
+    if st.session_state.waiting_for_question:
+        return
+    
+    st.markdown("### 🛠️ Deploy Your Solution:")
+    
+    # Answer input based on question type
+    question = st.session_state.current_question
+    
+    if question['mastery'] in ['python', 'react']:
+        # Code editor for programming questions
+        user_answer = st.text_area(
+            "Enter your code solution:",
+            value=st.session_state.user_answer,
+            height=200,
+            placeholder="# Enter your solution here...\n# Remember: This code will be deployed to production!\n",
+            key="code_input"
+        )
+        
+        # Add syntax highlighting preview
+        if user_answer:
+            st.markdown("**Code Preview:**")
+            st.code(user_answer, language='python' if question['mastery'] == 'python' else 'javascript')
+    
+    else:
+        # Text input for mathematics/theory questions
+        user_answer = st.text_area(
+            "Enter your solution:",
+            value=st.session_state.user_answer,
+            height=150,
+            placeholder="Provide your detailed solution and explanation...",
+            key="text_input"
+        )
+    
+    # Action buttons
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        if st.button("💾 Save Draft", use_container_width=True):
+            st.session_state.user_answer = user_answer
+            st.success("Draft saved!")
+    
+    with col2:
+        if st.button("🔍 Ask Team for Hint", use_container_width=True):
+            # Generate a contextual hint
+            st.info("💬 **Alex Chen:** Think about the specific requirements mentioned in the briefing. What's the most critical aspect we need to address first?")
+    
+    with col3:
+        if st.button("🚀 Deploy Solution", type="primary", use_container_width=True):
+            if user_answer.strip():
+                submit_answer(user_answer)
+            else:
+                st.warning("Please enter a solution before deploying!")
+
 def display_conversation_history():
     """Display the ongoing conversation/story"""
     
@@ -460,11 +686,7 @@ def display_current_input():
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("🔄 Start New Mission", type="primary", use_container_width=True):
-            # Reset session
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
-            st.rerun()
+        st.button("🔄 Start New Mission", type="primary", use_container_width=True, on_click=reset_session)
         return
     
     if st.session_state.waiting_for_question:
@@ -482,56 +704,64 @@ def display_current_input():
         return
     
     if st.session_state.awaiting_answer:
-        st.markdown("### 🛠️ Deploy Your Solution:")
-        
-        # Answer input based on question type
-        question = st.session_state.current_question
-        
-        if question['mastery'] in ['python', 'react']:
-            # Code editor for programming questions
-            user_answer = st.text_area(
-                "Enter your code solution:",
-                value=st.session_state.user_answer,
-                height=200,
-                placeholder="# Enter your solution here...\n# This code will be deployed immediately!\n",
-                key=f"code_input_{len(st.session_state.conversation_history)}"
-            )
-            
-            # Add syntax highlighting preview
-            if user_answer:
-                st.markdown("**Code Preview:**")
-                st.code(user_answer, language='python' if question['mastery'] == 'python' else 'javascript')
-        
-        else:
-            # Text input for mathematics/theory questions
-            user_answer = st.text_area(
-                "Enter your solution:",
-                value=st.session_state.user_answer,
-                height=150,
-                placeholder="Provide your detailed solution and explanation...",
-                key=f"text_input_{len(st.session_state.conversation_history)}"
-            )
-        
-        # Action buttons
-        col1, col2, col3 = st.columns([1, 1, 1])
-        
-        with col1:
-            if st.button("💾 Save Draft", use_container_width=True):
-                st.session_state.user_answer = user_answer
-                st.success("Draft saved!")
-        
-        with col2:
-            if st.button("🔍 Ask Team for Hint", use_container_width=True):
-                # Generate a contextual hint
-                st.info("💬 **Alex Chen:** Think about the specific requirements mentioned in the briefing. What's the most critical aspect we need to address first?")
+        display_answer_panel()
+
+# Typing, previewing and saving drafts rerun only this panel. Deploying (or
+# consulting the team) changes the sidebar and history, so those handlers
+# still call a full st.rerun().
+@st.fragment
+def display_answer_panel():
+    """Answer editor and actions for the current question"""
+    st.markdown("### 🛠️ Deploy Your Solution:")
+    
+    # Answer input based on question type
+    question = st.session_state.current_question
+    
+    if question['mastery'] in ['python', 'react']:
+        # Code editor for programming questions
+        user_answer = st.text_area(
+            "Enter your code solution:",
+            value=st.session_state.user_answer,
+            height=200,
+            placeholder="# Enter your solution here...\n# This code will be deployed immediately!\n",
+            key=f"code_input_{len(st.session_state.conversation_history)}"
+        )
         
-        with col3:
-            if st.button("🚀 Deploy Solution", type="primary", use_container_width=True):
-                if user_answer.strip():
-                    if submit_answer(user_answer):
-                        st.rerun()
-                else:
-                    st.warning("Please enter a solution before deploying!")
+        # Add syntax highlighting preview
+        if user_answer:
+            st.markdown("**Code Preview:**")
+            st.code(user_answer, language='python' if question['mastery'] == 'python' else 'javascript')
+    
+    else:
+        # Text input for mathematics/theory questions
+        user_answer = st.text_area(
+            "Enter your solution:",
+            value=st.session_state.user_answer,
+            height=150,
+            placeholder="Provide your detailed solution and explanation...",
+            key=f"text_input_{len(st.session_state.conversation_history)}"
+        )
+    
+    # Action buttons
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        if st.button("💾 Save Draft", use_container_width=True):
+            st.session_state.user_answer = user_answer
+            st.success("Draft saved!")
+    
+    with col2:
+        if st.button("🔍 Ask Team for Hint", use_container_width=True):
+            # Generate a contextual hint
+            st.info("💬 **Alex Chen:** Think about the specific requirements mentioned in the briefing. What's the most critical aspect we need to address first?")
+    
+    with col3:
+        if st.button("🚀 Deploy Solution", type="primary", use_container_width=True):
+            if user_answer.strip():
+                if submit_answer(user_answer):
+                    st.rerun()
+            else:
+                st.warning("Please enter a solution before deploying!")
 
 def main():
     initialize_game_state()
@@ -543,9 +773,13 @@ def main():
     display_header()
     display_stats_sidebar()
     
-    # Main content area - conversational flow
-    display_conversation_history()
-    display_current_input()
+    # Main content area
+    if CONVERSATIONAL:
+        display_conversation_history()
+        display_current_input()
+    else:
+        display_current_scenario()
+        display_answer_interface()
     
     # Footer with game info
     st.markdown("---")
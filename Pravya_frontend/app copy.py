@@ -1,28 +1,75 @@
 import streamlit as st
-import requests
+import httpx
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from api_client import canonical_json, fetch_json, fetch_json_cached
 
 # --- CONFIGURATION ---
 BACKEND_URL = "https://pravya-demo.onrender.com" # REPLACE WITH YOUR RENDER URL
 
 # --- API HELPERS ---
-def get_api_data(endpoint, payload=None):
+def get_api_data(endpoint, payload=None, cached=False):
     try:
-        url = f"{BACKEND_URL}/{endpoint}"
-        if payload is None:
-            response = requests.get(url)
-        else:
-            response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        if cached:
+            return fetch_json_cached(BACKEND_URL, endpoint, canonical_json(payload))
+        return fetch_json(BACKEND_URL, endpoint, payload)
+    except httpx.HTTPError as e:
         st.error(f"API Error: {e}", icon="📡")
         return None
 
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4)
+
+def request_hint_in_background(hint_payload):
+    """Start the hint request off the script thread; show_pending_hint renders it when ready"""
+    ctx = get_script_run_ctx()
+
+    def fetch(payload_json):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch_json_cached(BACKEND_URL, "get-narrative-hint", payload_json)
+
+    future = get_executor().submit(fetch, canonical_json(hint_payload))
+    st.session_state.pending_hint = (hint_payload["question_text"], future)
+
+def show_pending_hint(question_text, render):
+    """Poll the background hint from inside the dugout fragment; render(hint_text) once it arrives"""
+    pending = st.session_state.get("pending_hint")
+    if pending is None or pending[0] != question_text:
+        return
+    future = pending[1]
+    if not future.done():
+        st.caption("Getting tactical advice...")
+        time.sleep(0.3)
+        st.rerun(scope="fragment")
+    del st.session_state.pending_hint
+    try:
+        render(future.result().get('hint_text'))
+    except httpx.HTTPError as e:
+        st.error(f"API Error: {e}", icon="📡")
+
 # --- UI RENDERING ---
+@st.fragment
+def render_dugout_hint(question_details, character):
+    # A fragment, so asking for a hint and polling for it rerun only this section
+    if st.button("🤔 Ask the Dugout for a Hint"):
+        if question_details:
+            hint_payload = {"question_text": question_details.get("question_text", ""), "character_to_use": character}
+            request_hint_in_background(hint_payload)
+        else:
+            st.error("No question data available for a hint.")
+    show_pending_hint(
+        question_details.get("question_text", ""),
+        lambda hint_text: st.info(f"**{character} says:** \"{hint_text}\"")
+    )
+
 def render_selection_screen():
     st.title("Pravya: The IPL Challenge 🏏")
     st.markdown("Welcome, Analyst! Your strategic genius will decide if we lift the trophy.")
-    masteries = get_api_data("masteries")
+    masteries = get_api_data("masteries", cached=True)
     if masteries:
         options = ["-- Select your mastery --"] + masteries.get("masteries", [])
         selected = st.selectbox("Select Your Mastery:", options=options)
@@ -83,10 +130,10 @@ def render_test_screen():
                 if response:
                     # Announce new badges with a toast
                     new_badges = response.get("updated_state", {}).get("badges", [])
-                    old_badges = st.session_state.get("badges", [])
-                    for badge in new_badges:
-                        if badge not in old_badges:
-                            st.toast(f"Achievement Unlocked: {badge}!", icon="🏅")
+                    old_badges = set(st.session_state.get("badges", []))
+                    unlocked = [badge for badge in new_badges if badge not in old_badges]
+                    if unlocked:
+                        st.toast(f"Achievement{'s' if len(unlocked) > 1 else ''} Unlocked: {', '.join(unlocked)}!", icon="🏅")
                     
                     # Master update of state
                     st.session_state.current_data = response
@@ -108,16 +155,7 @@ def render_test_screen():
                 st.markdown(f"🏅 **{badge}**")
         
         st.markdown("---")
-        if st.button("🤔 Ask the Dugout for a Hint"):
-            question_details = story_payload.get("question_details", {})
-            if question_details:
-                with st.spinner("Getting tactical advice..."):
-                    hint_payload = {"question_text": question_details.get("question_text", ""), "character_to_use": character}
-                    hint_response = get_api_data("get-narrative-hint", hint_payload)
-                    if hint_response:
-                        st.info(f"**{character} says:** \"{hint_response.get('hint_text')}\"")
-            else:
-                st.error("No question data available for a hint.")
+        render_dugout_hint(story_payload.get("question_details", {}), character)
 
 # --- MAIN ROUTER ---
 if 'view' not in st.session_state:
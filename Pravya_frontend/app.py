@@ -1,8 +1,11 @@
 import streamlit as st
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from typing import Dict, Any
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Page configuration
 st.set_page_config(
@@ -16,8 +19,31 @@ st.set_page_config(
 BACKEND_URL = "http://localhost:8000"  # Change to your Render URL when deployed
 # BACKEND_URL = "https://pravya-demo.onrender.com"  # Change to your Render URL when deployed
 
+# Fail fast when the backend is unreachable; story generation itself has no read cap
+REQUEST_TIMEOUT = (3.05, None)
+
+# One pooled keep-alive session per server process. cache_resource keeps it
+# alive across reruns, so repeat calls skip the TCP/TLS handshake.
+@st.cache_resource
+def get_session() -> requests.Session:
+    session = requests.Session()
+    # Connection failures are retried (nothing was sent); POSTs are never
+    # replayed after the backend may have seen them
+    retry = Retry(total=2, connect=2, read=0, backoff_factor=0.25)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Bodies are pre-encoded with orjson and sent as data=
+    session.headers["Content-Type"] = "application/json"
+    return session
+
+# Background requests (e.g. prefetching the next question) share one long-lived pool
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4)
+
 # Custom CSS for immersive UI
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
@@ -135,7 +161,9 @@ st.markdown("""
         border: 1px solid #dee2e6;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 def initialize_game_state():
@@ -201,78 +229,118 @@ def display_header():
     </div>
     """, unsafe_allow_html=True)
 
+STAT_CARD_HTML = """
+        <div class="stat-card">
+            <h4 style="color: {color};">{title}</h4>
+            <p style="color: #6c757d;">{body}</p>
+        </div>
+        """
+
+MASTERY_DISPLAY = {
+    "python": "🐍 Python",
+    "react": "⚛️ React",
+    "mathematics": "📐 Mathematics",
+    "java": "Java",
+    "devops": "DevOps"
+}
+
+# (minimum trust, bar color), highest band first
+TRUST_COLORS = ((80, "#28a745"), (60, "#ffc107"), (0, "#dc3545"))
+
+def trust_color(trust: float) -> str:
+    for threshold, color in TRUST_COLORS:
+        if trust >= threshold:
+            return color
+    return TRUST_COLORS[-1][1]
+
+MEMBER_NAMES = {
+    "senior_dev": "Alex Chen",
+    "security_lead": "Maya Rodriguez",
+    "junior_dev": "Jordan Kim"
+}
+
+# Teammate ids as used by the hint and trust-decision endpoints
+TEAMMATE_NAMES = {
+    "alex_chen": "Alex Chen",
+    "maya_rodriguez": "Maya Rodriguez",
+    "jordan_kim": "Jordan Kim"
+}
+
+BADGE_NAMES = {
+    "code_warrior": "Code Warrior",
+    "debugging_master": "Debug Master",
+    "perfectionist": "Perfectionist",
+    "elite_developer": "Elite Dev"
+}
+
+def trust_bar_html(member: str, trust: float) -> str:
+    return f"""
+            <div style="margin: 0.5rem 0;">
+                <strong style="color: #ffffff;">{MEMBER_NAMES.get(member, member)}</strong><br>
+                <div style="background: #e9ecef; border-radius: 10px; height: 20px; overflow: hidden;">
+                    <div style="background: {trust_color(trust)}; height: 100%; width: {trust}%; transition: width 0.3s;"></div>
+                </div>
+                <small style="color: #6c757d;">{trust:.0f}% trust</small>
+            </div>
+            """
+
 def display_stats_sidebar():
     with st.sidebar:
         st.markdown("### 📊 Mission Status")
         
         game_state = st.session_state.game_state
         
-        # Player stats
-        st.markdown(f"""
-        <div class="stat-card">
-            <h4 style="color: #212529;">Developer Level: {game_state['player_level']}</h4>
-            <p style="color: #6c757d;">XP: {game_state['experience_points']}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
         # Performance indicator
         performance_color = "#28a745" if game_state['performance_score'] >= 70 else "#ffc107" if game_state['performance_score'] >= 50 else "#dc3545"
-        st.markdown(f"""
-        <div class="stat-card">
-            <h4 style="color: {performance_color}">Performance: {game_state['performance_score']:.1f}%</h4>
-            <p style="color: #6c757d;">Current Streak: {game_state['streak_count']}</p>
-        </div>
-        """, unsafe_allow_html=True)
         
         # Selected mastery
-        mastery_display = {
-            "python": "🐍 Python",
-            "react": "⚛️ React",
-            "mathematics": "📐 Mathematics",
-            "java" : "Java",
-            "devops": "DevOps"
-        }.get(game_state['selected_mastery'], game_state['selected_mastery'])
+        mastery_display = MASTERY_DISPLAY.get(game_state['selected_mastery'], game_state['selected_mastery'])
         
-        st.markdown(f"""
-        <div class="stat-card">
-            <h4 style="color: #2196f3;">Specialization</h4>
-            <p style="color: #6c757d;">{mastery_display}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # Player stats, performance and specialization cards in one element
+        st.markdown("".join([
+            STAT_CARD_HTML.format_map({
+                "color": "#212529",
+                "title": f"Developer Level: {game_state['player_level']}",
+                "body": f"XP: {game_state['experience_points']}"
+            }),
+            STAT_CARD_HTML.format_map({
+                "color": performance_color,
+                "title": f"Performance: {game_state['performance_score']:.1f}%",
+                "body": f"Current Streak: {game_state['streak_count']}"
+            }),
+            STAT_CARD_HTML.format_map({
+                "color": "#2196f3",
+                "title": "Specialization",
+                "body": mastery_display
+            })
+        ]), unsafe_allow_html=True)
         
         # Team trust levels
         st.markdown("### 🤝 Team Trust")
-        for member, trust in game_state['team_trust'].items():
-            trust_color = "#28a745" if trust >= 80 else "#ffc107" if trust >= 60 else "#dc3545"
-            member_name = {
-                "senior_dev": "Alex Chen",
-                "security_lead": "Maya Rodriguez", 
-                "junior_dev": "Jordan Kim"
-            }.get(member, member)
-            
-            st.markdown(f"""
-            <div style="margin: 0.5rem 0;">
-                <strong style="color: #ffffff;">{member_name}</strong><br>
-                <div style="background: #e9ecef; border-radius: 10px; height: 20px; overflow: hidden;">
-                    <div style="background: {trust_color}; height: 100%; width: {trust}%; transition: width 0.3s;"></div>
-                </div>
-                <small style="color: #6c757d;">{trust:.0f}% trust</small>
-            </div>
-            """, unsafe_allow_html=True)
+        # One markdown element for the whole team instead of one per member
+        st.markdown("".join(
+            trust_bar_html(member, trust) for member, trust in game_state['team_trust'].items()
+        ), unsafe_allow_html=True)
         
         # Badges
         if game_state['badges']:
             st.markdown("### 🏆 Achievements")
-            badge_names = {
-                "code_warrior": "Code Warrior",
-                "debugging_master": "Debug Master",
-                "perfectionist": "Perfectionist",
-                "elite_developer": "Elite Dev"
-            }
             
-            for badge in game_state['badges']:
-                badge_display = badge_names.get(badge, badge.replace('_', ' ').title())
-                st.markdown(f'<span class="achievement-badge">{badge_display}</span>', unsafe_allow_html=True)
+            # One markdown element for all badges instead of one per badge
+            st.markdown("\n\n".join(
+                f'<span class="achievement-badge">{BADGE_NAMES.get(badge, badge.replace("_", " ").title())}</span>'
+                for badge in game_state['badges']
+            ), unsafe_allow_html=True)
+
+# Button callbacks run before the rerun their click triggers, so the page
+# renders the new state straight away without a second st.rerun() pass.
+def select_mastery(mastery: str):
+    st.session_state.game_state['selected_mastery'] = mastery
+    st.session_state.mastery_selected = True
+
+def reset_session():
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
 
 def display_mastery_selection():
     """Display subject selection interface"""
@@ -295,10 +363,7 @@ def display_mastery_selection():
             <p>Master Python programming, algorithms, data structures, and backend development challenges.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose Python", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "python"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose Python", use_container_width=True, type="primary", on_click=select_mastery, args=("python",))
     
     with col2:
         st.markdown("""
@@ -307,10 +372,7 @@ def display_mastery_selection():
             <p>Tackle React components, state management, hooks, and frontend architecture problems.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose React", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "react"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose React", use_container_width=True, type="primary", on_click=select_mastery, args=("react",))
     
     with col3:
         st.markdown("""
@@ -319,10 +381,7 @@ def display_mastery_selection():
             <p>Solve complex mathematical problems, algorithms, statistics, and computational challenges.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose Mathematics", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "mathematics"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose Mathematics", use_container_width=True, type="primary", on_click=select_mastery, args=("mathematics",))
     with col4:
         st.markdown("""
         <div class="stat-card">
@@ -330,10 +389,7 @@ def display_mastery_selection():
             <p>Solve complex Java problems, algorithms, challenges.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose Java", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "java"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose Java", use_container_width=True, type="primary", on_click=select_mastery, args=("java",))
     with col5:
         st.markdown("""
         <div class="stat-card">
@@ -341,10 +397,7 @@ def display_mastery_selection():
             <p>Solve complex Devops problems, algorithms, challenges.</p>
         </div>
         """, unsafe_allow_html=True)
-        if st.button("Choose DevOps", use_container_width=True, type="primary"):
-            st.session_state.game_state['selected_mastery'] = "devops"
-            st.session_state.mastery_selected = True
-            st.rerun()
+        st.button("Choose DevOps", use_container_width=True, type="primary", on_click=select_mastery, args=("devops",))
     
     st.markdown("---")
     st.markdown("""
@@ -358,18 +411,41 @@ def display_mastery_selection():
     
     return False
 
+def next_question_payload() -> bytes:
+    return orjson.dumps({"game_state": st.session_state.game_state}, option=orjson.OPT_SORT_KEYS)
+
+def prefetch_next_question():
+    """Start fetching the next question while the player reads the story continuation"""
+    payload = next_question_payload()
+    future = get_executor().submit(
+        get_session().post,
+        f"{BACKEND_URL}/get_next_question",
+        data=payload,
+        timeout=REQUEST_TIMEOUT,
+    )
+    st.session_state.next_question_prefetch = (payload, future)
+
 def get_next_question():
     """Fetch next question from backend"""
     try:
         with st.spinner("🔄 Analyzing system breach..."):
-            response = requests.post(
-                f"{BACKEND_URL}/get_next_question",
-                json={"game_state": st.session_state.game_state},
-                # timeout=30
-            )
+            # Use the prefetched response if it was made for this exact game state
+            response = None
+            prefetch = st.session_state.pop('next_question_prefetch', None)
+            if prefetch and prefetch[0] == next_question_payload():
+                try:
+                    response = prefetch[1].result()
+                except requests.exceptions.RequestException:
+                    response = None
+            if response is None:
+                response = get_session().post(
+                    f"{BACKEND_URL}/get_next_question",
+                    data=orjson.dumps({"game_state": st.session_state.game_state}),
+                    timeout=REQUEST_TIMEOUT
+                )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             st.session_state.current_question = data['question']
             st.session_state.current_narrative = data['narrative']
             st.session_state.urgency_level = data.get('urgency_level', 'medium')
@@ -397,18 +473,18 @@ def submit_answer(user_answer: str):
     """Submit user's answer for evaluation"""
     try:
         with st.spinner("🔍 Deploying solution..."):
-            response = requests.post(
+            response = get_session().post(
                 f"{BACKEND_URL}/submit_answer",
-                json={
+                data=orjson.dumps({
                     "game_state": st.session_state.game_state,
                     "user_answer": user_answer,
                     "question_id": st.session_state.current_question['id']
-                },
-                # timeout=30
+                }),
+                timeout=REQUEST_TIMEOUT
             )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             st.session_state.game_state = data['updated_game_state']
             
             # Add user answer to conversation history
@@ -439,6 +515,7 @@ def submit_answer(user_answer: str):
                 # Reset for next question
                 st.session_state.awaiting_answer = False
                 st.session_state.waiting_for_question = True
+                prefetch_next_question()
             
             st.session_state.user_answer = ""
             
@@ -460,17 +537,17 @@ def get_team_hints():
     """Get hints from all teammates"""
     try:
         with st.spinner("🤔 Consulting the team..."):
-            response = requests.post(
+            response = get_session().post(
                 f"{BACKEND_URL}/get_team_hints",
-                json={
+                data=orjson.dumps({
                     "game_state": st.session_state.game_state,
                     "question_id": st.session_state.current_question['id']
-                },
-                # timeout=30
+                }),
+                timeout=REQUEST_TIMEOUT
             )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             st.session_state.team_hints = data['hints']
             st.session_state.show_hints = True
             st.session_state.awaiting_trust_decision = True
@@ -487,18 +564,20 @@ def submit_trust_decision(trusted_teammate: str):
     """Submit trust decision and handle consequences"""
     try:
         with st.spinner("⚖️ Processing trust decision..."):
-            response = requests.post(
+            response = get_session().post(
                 f"{BACKEND_URL}/submit_trust_decision",
-                json={
+                data=orjson.dumps({
                     "game_state": st.session_state.game_state,
                     "question_id": st.session_state.current_question['id'],
-                    "trusted_teammate": trusted_teammate
-                },
-                # timeout=30
+                    "trusted_teammate": trusted_teammate,
+                    # The backend keeps no hint state; it judges against what we were shown
+                    "hints": st.session_state.team_hints
+                }),
+                timeout=REQUEST_TIMEOUT
             )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             st.session_state.game_state = data['updated_game_state']
             
             # Add trust decision to conversation history
@@ -523,18 +602,18 @@ def submit_trust_decision(trusted_teammate: str):
     """Submit user's answer for evaluation"""
     try:
         with st.spinner("🔍 Deploying solution..."):
-            response = requests.post(
+            response = get_session().post(
                 f"{BACKEND_URL}/submit_answer",
-                json={
+                data=orjson.dumps({
                     "game_state": st.session_state.game_state,
                     "user_answer": user_answer,
                     "question_id": st.session_state.current_question['id']
-                },
-                # timeout=30
+                }),
+                timeout=REQUEST_TIMEOUT
             )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             st.session_state.game_state = data['updated_game_state']
             
             # Add user answer to conversation history
@@ -657,13 +736,7 @@ def display_conversation_history():
         
         elif entry['type'] == 'trust_decision':
             # Trust decision results
-            teammate_names = {
-                "alex_chen": "Alex Chen", 
-                "maya_rodriguez": "Maya Rodriguez",
-                "jordan_kim": "Jordan Kim"
-            }
-            
-            trusted_name = teammate_names.get(entry['trusted_teammate'], entry['trusted_teammate'])
+            trusted_name = TEAMMATE_NAMES.get(entry['trusted_teammate'], entry['trusted_teammate'])
             
             if entry['is_correct']:
                 st.markdown(f"""
@@ -715,13 +788,13 @@ def display_team_hints():
     for hint in st.session_state.team_hints:
         teammate = teammate_info[hint['character']]
         trust_level = teammate['trust']
-        trust_color = "#28a745" if trust_level >= 80 else "#ffc107" if trust_level >= 60 else "#dc3545"
+        bar_color = trust_color(trust_level)
         
         st.markdown(f"""
         <div class="hint-card">
             <h4>{teammate['emoji']} {teammate['name']} - {teammate['role']}</h4>
             <div style="background: #e9ecef; border-radius: 10px; height: 8px; margin: 0.5rem 0;">
-                <div style="background: {trust_color}; height: 100%; width: {trust_level}%; border-radius: 10px;"></div>
+                <div style="background: {bar_color}; height: 100%; width: {trust_level}%; border-radius: 10px;"></div>
             </div>
             <p><strong>Advice:</strong> "{hint['hint']}"</p>
         </div>
@@ -769,11 +842,7 @@ def display_current_input():
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("🔄 Start New Mission", type="primary", use_container_width=True):
-            # Reset session
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
-            st.rerun()
+        st.button("🔄 Start New Mission", type="primary", use_container_width=True, on_click=reset_session)
         return
     
     if st.session_state.awaiting_trust_decision:
@@ -797,75 +866,83 @@ def display_current_input():
         return
     
     if st.session_state.awaiting_answer:
-        st.markdown("### 🛠️ Deploy Your Solution:")
-        
-        # Answer input based on question type
-        question = st.session_state.current_question
-        
-        # Check if it's a boss battle
-        is_boss = question.get('difficulty_level') == 'boss'
-        
-        if is_boss:
-            st.markdown("""
-            <div class="boss-battle">
-                <h4>⚡ BOSS BATTLE ACTIVE ⚡</h4>
-                <p>This is your final test! One perfect solution to end the digital chaos.</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        if question['mastery'] in ['python', 'react']:
-            # Code editor for programming questions
-            user_answer = st.text_area(
-                "Enter your ultimate solution:" if is_boss else "Enter your code solution:",
-                value=st.session_state.user_answer,
-                height=300 if is_boss else 200,
-                placeholder="# This is it - your final stand against the AI corruption!\n# Code with precision, the digital realm depends on you!\n" if is_boss else "# Enter your solution here...\n# This code will be deployed immediately!\n",
-                key=f"code_input_{len(st.session_state.conversation_history)}"
-            )
-            
-            # Add syntax highlighting preview
-            if user_answer:
-                st.markdown("**Code Preview:**")
-                st.code(user_answer, language='python' if question['mastery'] == 'python' else 'javascript')
+        display_answer_panel()
+
+# Typing, previewing and saving drafts rerun only this panel. Deploying (or
+# consulting the team) changes the sidebar and history, so those handlers
+# still call a full st.rerun().
+@st.fragment
+def display_answer_panel():
+    """Answer editor and actions for the current question"""
+    st.markdown("### 🛠️ Deploy Your Solution:")
+    
+    # Answer input based on question type
+    question = st.session_state.current_question
+    
+    # Check if it's a boss battle
+    is_boss = question.get('difficulty_level') == 'boss'
+    
+    if is_boss:
+        st.markdown("""
+        <div class="boss-battle">
+            <h4>⚡ BOSS BATTLE ACTIVE ⚡</h4>
+            <p>This is your final test! One perfect solution to end the digital chaos.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    if question['mastery'] in ['python', 'react']:
+        # Code editor for programming questions
+        user_answer = st.text_area(
+            "Enter your ultimate solution:" if is_boss else "Enter your code solution:",
+            value=st.session_state.user_answer,
+            height=300 if is_boss else 200,
+            placeholder="# This is it - your final stand against the AI corruption!\n# Code with precision, the digital realm depends on you!\n" if is_boss else "# Enter your solution here...\n# This code will be deployed immediately!\n",
+            key=f"code_input_{len(st.session_state.conversation_history)}"
+        )
         
+        # Add syntax highlighting preview
+        if user_answer:
+            st.markdown("**Code Preview:**")
+            st.code(user_answer, language='python' if question['mastery'] == 'python' else 'javascript')
+    
+    else:
+        # Text input for mathematics/theory questions
+        user_answer = st.text_area(
+            "Enter your ultimate solution:" if is_boss else "Enter your solution:",
+            value=st.session_state.user_answer,
+            height=250 if is_boss else 150,
+            placeholder="Provide your final, definitive solution to end this crisis..." if is_boss else "Provide your detailed solution and explanation...",
+            key=f"text_input_{len(st.session_state.conversation_history)}"
+        )
+    
+    # Action buttons
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        if st.button("💾 Save Draft", use_container_width=True):
+            st.session_state.user_answer = user_answer
+            st.success("Draft saved!")
+    
+    with col2:
+        if not st.session_state.show_hints:
+            if st.button("🤔 Ask Team for Advice", use_container_width=True):
+                if get_team_hints():
+                    st.rerun()
         else:
-            # Text input for mathematics/theory questions
-            user_answer = st.text_area(
-                "Enter your ultimate solution:" if is_boss else "Enter your solution:",
-                value=st.session_state.user_answer,
-                height=250 if is_boss else 150,
-                placeholder="Provide your final, definitive solution to end this crisis..." if is_boss else "Provide your detailed solution and explanation...",
-                key=f"text_input_{len(st.session_state.conversation_history)}"
-            )
-        
-        # Action buttons
-        col1, col2, col3 = st.columns([1, 1, 1])
-        
-        with col1:
-            if st.button("💾 Save Draft", use_container_width=True):
-                st.session_state.user_answer = user_answer
-                st.success("Draft saved!")
-        
-        with col2:
-            if not st.session_state.show_hints:
-                if st.button("🤔 Ask Team for Advice", use_container_width=True):
-                    if get_team_hints():
-                        st.rerun()
+            st.button("🤔 Team Consulted", disabled=True, use_container_width=True)
+    
+    with col3:
+        deploy_text = "🔥 DEPLOY FINAL SOLUTION" if is_boss else "🚀 Deploy Solution"
+        if st.button(deploy_text, type="primary", use_container_width=True):
+            if user_answer.strip():
+                if submit_answer(user_answer):
+                    # Reset hint state for next question
+                    st.session_state.show_hints = False
+                    st.session_state.team_hints = []
+                    st.session_state.awaiting_trust_decision = False
+                    st.rerun()
             else:
-                st.button("🤔 Team Consulted", disabled=True, use_container_width=True)
-        
-        with col3:
-            deploy_text = "🔥 DEPLOY FINAL SOLUTION" if is_boss else "🚀 Deploy Solution"
-            if st.button(deploy_text, type="primary", use_container_width=True):
-                if user_answer.strip():
-                    if submit_answer(user_answer):
-                        # Reset hint state for next question
-                        st.session_state.show_hints = False
-                        st.session_state.team_hints = []
-                        st.session_state.awaiting_trust_decision = False
-                        st.rerun()
-                else:
-                    st.warning("Please enter a solution before deploying!")
+                st.warning("Please enter a solution before deploying!")
 
 def main():
     initialize_game_state()